@@ -272,8 +272,9 @@ server.setRequestHandler(CallToolRequestSchema, async (request) => {
           isError: true,
         };
     }
+    // Compact JSON: the client parses it, nobody reads it
     return {
-      content: [{ type: "text", text: JSON.stringify(result, null, 2) }],
+      content: [{ type: "text", text: JSON.stringify(result) }],
     };
   } catch (error) {
     return {
@@ -301,7 +302,20 @@ runServer().catch((error) => {
 
 // Connect to SQL only when handling a request
 
+// In-flight connection attempt shared by concurrent requests
+let globalConnectPromise: Promise<void> | null = null;
+
 async function ensureSqlConnection() {
+  // Requests may arrive concurrently; make them all wait on a single connect
+  if (!globalConnectPromise) {
+    globalConnectPromise = connectSql().finally(() => {
+      globalConnectPromise = null;
+    });
+  }
+  return globalConnectPromise;
+}
+
+async function connectSql() {
   // Check if using SQL authentication (no token) or Azure AD (with token)
   const usingSqlAuth = process.env.MSSQL_CONNECTION_STRING ||
                        (process.env.SQL_USER && process.env.SQL_PASSWORD);
@@ -0,0 +1,35 @@
+import sql from "mssql";
+
+// JSON schema shared by tools that accept positional query parameters
+export const queryParamsSchema = {
+  type: "array",
+  items: { type: ["string", "number", "boolean", "null"] },
+  description: "Optional positional parameters bound as @p1, @p2, ... in the SQL text. Example: \"genre = @p1\" with params [\"comedy\"]. Prefer these over inlining values so SQL Server can reuse the cached query plan.",
+};
+
+/**
+ * Binds positional parameters to a request as @p1, @p2, ...
+ * ASCII strings are sent as VARCHAR so they compare against VARCHAR columns
+ * without an implicit conversion that would prevent index seeks.
+ * @param request The request to bind the parameters to
+ * @param params The parameter values, in order
+ */
+export function bindQueryParams(request: sql.Request, params: unknown): void {
+  if (params === undefined || params === null) {
+    return;
+  }
+  if (!Array.isArray(params)) {
+    throw new Error("params must be an array");
+  }
+
+  params.forEach((value, index) => {
+    const name = `p${index + 1}`;
+    if (typeof value === "string") {
+      request.input(name, /^[\x00-\x7F]*$/.test(value) ? sql.VarChar : sql.NVarChar, value);
+    } else if (value === null || typeof value === "number" || typeof value === "boolean") {
+      request.input(name, value);
+    } else {
+      throw new Error(`Unsupported type for parameter @${name}`);
+    }
+  });
+}
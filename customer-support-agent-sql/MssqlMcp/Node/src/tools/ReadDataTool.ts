@@ -1,5 +1,6 @@
 import sql from "mssql";
 import { Tool } from "@modelcontextprotocol/sdk/types.js";
+import { bindQueryParams, queryParamsSchema } from "./QueryParams.js";
 
 export class ReadDataTool implements Tool {
   [key: string]: any;
@@ -13,6 +14,7 @@ export class ReadDataTool implements Tool {
         type: "string", 
         description: "SQL SELECT query to execute (must start with SELECT and cannot contain destructive operations). Example: SELECT * FROM movies WHERE genre = 'comedy'" 
       },
+      params: queryParamsSchema,
     },
     required: ["query"],
   } as any;
@@ -205,7 +207,7 @@ export class ReadDataTool implements Tool {
    */
   async run(params: any) {
     try {
-      const { query } = params;
+      const { query, params: queryParams } = params;
       
       // Validate the query for security issues
       const validation = this.validateQuery(query);
@@ -218,11 +220,13 @@ export class ReadDataTool implements Tool {
         };
       }
 
-      // Log the query for audit purposes (in production, consider more secure logging)
-      console.log(`Executing validated SELECT query: ${query.substring(0, 200)}${query.length > 200 ? '...' : ''}`);
+      // Log the query for audit purposes (in production, consider more secure logging).
+      // stdout carries the JSON-RPC stream, so logs must go to stderr.
+      console.error(`Executing validated SELECT query: ${query.substring(0, 200)}${query.length > 200 ? '...' : ''}`);
 
       // Execute the query
       const request = new sql.Request();
+      bindQueryParams(request, queryParams);
       const result = await request.query(query);
       
       // Sanitize the result
@@ -245,7 +249,9 @@ export class ReadDataTool implements Tool {
       
       // Don't expose internal error details to prevent information leakage
       const errorMessage = error instanceof Error ? error.message : 'Unknown error occurred';
-      const safeErrorMessage = errorMessage.includes('Invalid object name') 
+      // Missing-object and full-text errors are safe to pass through; the
+      // agent uses the latter to fall back from CONTAINS to LIKE searches
+      const safeErrorMessage = errorMessage.includes('Invalid object name') || /full-text/i.test(errorMessage)
         ? errorMessage 
         : 'Database query execution failed';
       
@@ -1,5 +1,6 @@
 import sql from "mssql";
 import { Tool } from "@modelcontextprotocol/sdk/types.js";
+import { bindQueryParams, queryParamsSchema } from "./QueryParams.js";
 
 export class UpdateDataTool implements Tool {
   [key: string]: any;
@@ -20,6 +21,7 @@ export class UpdateDataTool implements Tool {
         type: "string", 
         description: "WHERE clause to identify which records to update. Example: \"genre = 'comedy' AND created_date <= '2025-07-05'\"" 
       },
+      params: queryParamsSchema,
     },
     required: ["tableName", "updates", "whereClause"],
   } as any;
@@ -27,7 +29,7 @@ export class UpdateDataTool implements Tool {
   async run(params: any) {
     let query: string | undefined;
     try {
-      const { tableName, updates, whereClause } = params;
+      const { tableName, updates, whereClause, params: whereParams } = params;
       
       // Basic validation: ensure whereClause is not empty
       if (!whereClause || whereClause.trim() === '') {
@@ -35,6 +37,7 @@ export class UpdateDataTool implements Tool {
       }
 
       const request = new sql.Request();
+      bindQueryParams(request, whereParams);
       
       // Build SET clause with parameterized queries for security
       const setClause = Object.keys(updates)
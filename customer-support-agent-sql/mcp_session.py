@@ -0,0 +1,187 @@
+"""
+MCP Session
+
+Long-lived stdio JSON-RPC connection to the MSSQL MCP server, shared by the
+customer support agent and the MCP integration tests.
+"""
+
+import os
+import json
+import asyncio
+import itertools
+import subprocess
+import threading
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+from typing import Any, Dict, Tuple
+
+
+class MCPSession:
+    """
+    Long-lived connection to the MCP server.
+
+    The Node.js server is started lazily on the first tool call and kept alive
+    for the lifetime of the agent, so each call only pays for a JSON-RPC round
+    trip instead of a process spawn, Node.js startup and database login.
+
+    Pipe I/O runs on plain threads rather than asyncio subprocess streams so
+    the one process can serve both sync callers and any number of event
+    loops (each asyncio.run() creates a new one).
+    """
+
+    def __init__(self, server_path: str):
+        self.server_path = server_path
+        self.proc = None
+        self._ids = itertools.count(1)
+        # Guards process startup, stdin writes and the pending maps; responses
+        # are matched by id so several requests can be in flight at once
+        self._lock = threading.Lock()
+        # Requests sent to the current process, by id. Each process gets its own
+        # map so a reader left over from a dead process cannot fail requests
+        # sent to its replacement
+        self._pending: Dict[int, Future] = {}
+
+    def _ensure_started(self) -> None:
+        """Start the MCP server process if it is not running."""
+        if self.proc is not None and self.proc.poll() is None:
+            return
+
+        # Prepare environment variables for MCP server
+        # The MCP server will inherit these environment variables
+        env = os.environ.copy()
+
+        # These environment variables configure the MCP server's database connection
+        # They can be set in the .env file or passed directly here
+        # Required: SERVER_NAME, DATABASE_NAME
+        # Optional: READONLY, CONNECTION_TIMEOUT, TRUST_SERVER_CERTIFICATE
+
+        self._pending = {}
+        self.proc = subprocess.Popen(
+            ["node", self.server_path],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            env=env  # Pass environment variables to MCP server
+        )
+
+        # Drain stderr in the background so the server never blocks on a full pipe
+        threading.Thread(target=self._drain_stderr, args=(self.proc,), daemon=True).start()
+        threading.Thread(target=self._read_responses, args=(self.proc, self._pending), daemon=True).start()
+
+    @staticmethod
+    def _drain_stderr(proc: subprocess.Popen) -> None:
+        for line in proc.stderr:
+            if line.strip():
+                print(f"MCP Server stderr: {line.rstrip()}")
+
+    def _read_responses(self, proc: subprocess.Popen, pending: Dict[int, Future]) -> None:
+        """Dispatch each JSON-RPC response to the caller waiting on its id."""
+        for line in proc.stdout:
+            # Every JSON-RPC frame is a single JSON object per line; skip
+            # anything else without attempting a parse
+            if not line.startswith("{"):
+                continue
+            try:
+                response = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(response, dict):
+                continue
+            with self._lock:
+                future = pending.pop(response.get("id"), None)
+            # An async caller that timed out has already cancelled its future
+            if future is not None and not future.done():
+                future.set_result(response)
+
+        # The server exited; fail any requests still waiting on it
+        with self._lock:
+            futures = list(pending.values())
+            pending.clear()
+            # stdout can close before the process has been reaped; make sure
+            # the next call starts a new server instead of writing to this one
+            if self.proc is proc:
+                self.proc = None
+        for future in futures:
+            if not future.done():
+                future.set_exception(ConnectionError("MCP server exited before responding"))
+
+    def _send(self, tool_name: str, arguments: Dict[str, Any]) -> Tuple[Dict[int, Future], int, Future]:
+        """
+        Write a tools/call request; the future resolves to the raw response.
+
+        Also returns the pending map the request was registered in, so the
+        caller can remove it again even if the process has been restarted.
+        """
+        future = Future()
+        with self._lock:
+            self._ensure_started()
+
+            request_id = next(self._ids)
+            request = {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": "tools/call",
+                "params": {
+                    "name": tool_name,
+                    "arguments": arguments
+                }
+            }
+            pending = self._pending
+            pending[request_id] = future
+            self.proc.stdin.write(json.dumps(request) + "\n")
+            self.proc.stdin.flush()
+        return pending, request_id, future
+
+    def _forget(self, pending: Dict[int, Future], request_id: int) -> None:
+        with self._lock:
+            pending.pop(request_id, None)
+
+    def call(self, tool_name: str, arguments: Dict[str, Any], timeout: float = 60) -> Dict[str, Any]:
+        """Send a tools/call request and wait for the response with the same id."""
+        pending, request_id, future = self._send(tool_name, arguments)
+        try:
+            # 60 second default timeout covers the initial database connection
+            response = future.result(timeout=timeout)
+        finally:
+            self._forget(pending, request_id)
+        return parse_mcp_response(response)
+
+    async def call_async(self, tool_name: str, arguments: Dict[str, Any], timeout: float = 60) -> Dict[str, Any]:
+        """Like call(), but awaits the response without blocking the event loop."""
+        pending, request_id, future = self._send(tool_name, arguments)
+        try:
+            response = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            # Before Python 3.11 this is not concurrent.futures.TimeoutError,
+            # which is what callers handle for both call() and call_async()
+            raise FuturesTimeoutError() from None
+        finally:
+            self._forget(pending, request_id)
+        return parse_mcp_response(response)
+
+    def close(self) -> None:
+        """Close stdin so the server can exit, killing it if it does not."""
+        if self.proc is None or self.proc.poll() is not None:
+            return
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.proc.kill()
+
+
+def parse_mcp_response(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the tool result from a JSON-RPC response."""
+    if "error" in response:
+        return {"success": False, "message": response["error"].get("message", "Unknown MCP error")}
+
+    result = response.get("result", {})
+    # Extract the text content from MCP response
+    if "content" in result and len(result["content"]) > 0:
+        content_text = result["content"][0].get("text", "{}")
+        try:
+            return json.loads(content_text)
+        except json.JSONDecodeError:
+            return {"success": False, "message": content_text}
+    return result
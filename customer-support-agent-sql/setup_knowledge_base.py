@@ -15,6 +15,10 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# Full-text catalog holding the knowledge base index
+FULL_TEXT_CATALOG = "kb_ft"
+
+
 def connect_to_database(connection_string: str) -> pyodbc.Connection:
     """Connect to the MSSQL database."""
     try:
@@ -26,28 +30,24 @@ def connect_to_database(connection_string: str) -> pyodbc.Connection:
         raise
 
 
-def drop_table_if_exists(connection: pyodbc.Connection, table_name: str) -> None:
+def drop_table_if_exists(cursor: pyodbc.Cursor, table_name: str) -> None:
     """Drop the table if it exists."""
-    cursor = connection.cursor()
     try:
         cursor.execute(f"IF OBJECT_ID('{table_name}', 'U') IS NOT NULL DROP TABLE {table_name}")
-        connection.commit()
+        cursor.commit()
         print(f"✓ Dropped existing table '{table_name}' (if it existed)")
     except pyodbc.Error as e:
-        connection.rollback()
+        cursor.rollback()
         print(f"❌ Failed to drop table: {e}")
         raise
-    finally:
-        cursor.close()
 
 
-def create_knowledge_base_table(connection: pyodbc.Connection, table_name: str) -> None:
+def create_knowledge_base_table(cursor: pyodbc.Cursor, table_name: str) -> None:
     """Create the knowledge_base table."""
-    cursor = connection.cursor()
     try:
         create_sql = f"""
         CREATE TABLE {table_name} (
-            id INT IDENTITY(1,1) PRIMARY KEY,
+            id INT IDENTITY(1,1) CONSTRAINT PK_{table_name} PRIMARY KEY,
             keyword VARCHAR(50) NOT NULL,
             article NVARCHAR(MAX) NOT NULL
         )
@@ -57,20 +57,49 @@ def create_knowledge_base_table(connection: pyodbc.Connection, table_name: str)
         # Create index for better search performance
         cursor.execute(f"CREATE INDEX idx_keyword ON {table_name}(keyword)")
         
-        connection.commit()
+        cursor.commit()
         print(f"✓ Created table '{table_name}' with index")
     except pyodbc.Error as e:
-        connection.rollback()
+        cursor.rollback()
         print(f"❌ Failed to create table: {e}")
         raise
+
+
+def create_full_text_index(cursor: pyodbc.Cursor, table_name: str) -> bool:
+    """
+    Create a full-text index on keyword and article for CONTAINS searches.
+
+    Returns False if full-text search is unavailable; the agent then falls
+    back to LIKE matching.
+    """
+    cursor.execute("SELECT FULLTEXTSERVICEPROPERTY('IsFullTextInstalled')")
+    if not cursor.fetchone()[0]:
+        print("⚠️  Warning: Full-text search is not installed, the agent will use LIKE matching")
+        return False
+
+    # Full-text DDL cannot run inside a user transaction
+    connection = cursor.connection
+    connection.autocommit = True
+    try:
+        cursor.execute(
+            f"IF NOT EXISTS (SELECT 1 FROM sys.fulltext_catalogs WHERE name = '{FULL_TEXT_CATALOG}') "
+            f"CREATE FULLTEXT CATALOG {FULL_TEXT_CATALOG}"
+        )
+        cursor.execute(
+            f"CREATE FULLTEXT INDEX ON {table_name}(keyword, article) "
+            f"KEY INDEX PK_{table_name} ON {FULL_TEXT_CATALOG} WITH CHANGE_TRACKING AUTO"
+        )
+        print(f"✓ Created full-text index on '{table_name}'")
+        return True
+    except pyodbc.Error as e:
+        print(f"⚠️  Warning: Could not create full-text index, the agent will use LIKE matching: {e}")
+        return False
     finally:
-        cursor.close()
+        connection.autocommit = False
 
 
-def populate_knowledge_base(connection: pyodbc.Connection, table_name: str) -> None:
+def populate_knowledge_base(cursor: pyodbc.Cursor, table_name: str) -> None:
     """Populate the knowledge_base table with articles."""
-    cursor = connection.cursor()
-    
     articles = [
         ("return", "Return Policy: Items can be returned within 30 days of delivery. Visit our returns portal or contact support to initiate a return."),
         ("shipping", "Shipping Information: Standard shipping takes 5-7 business days. Express shipping takes 2-3 business days. Free shipping on orders over $50."),
@@ -80,15 +109,15 @@ def populate_knowledge_base(connection: pyodbc.Connection, table_name: str) -> N
     
     try:
         insert_sql = f"INSERT INTO {table_name} (keyword, article) VALUES (?, ?)"
+        # Send all rows as one parameter array instead of one round trip per row
+        cursor.fast_executemany = True
         cursor.executemany(insert_sql, articles)
-        connection.commit()
+        cursor.commit()
         print(f"✓ Inserted {len(articles)} articles into '{table_name}'")
     except pyodbc.Error as e:
-        connection.rollback()
+        cursor.rollback()
         print(f"❌ Failed to insert articles: {e}")
         raise
-    finally:
-        cursor.close()
 
 
 def main() -> int:
@@ -109,20 +138,25 @@ def main() -> int:
         # Connect to database
         print("\n🔌 Connecting to database...")
         conn = connect_to_database(connection_string)
+        cursor = conn.cursor()
         
         # Drop existing table
-        drop_table_if_exists(conn, table_name)
+        drop_table_if_exists(cursor, table_name)
         
         # Create table
-        create_knowledge_base_table(conn, table_name)
+        create_knowledge_base_table(cursor, table_name)
         
         # Populate table
-        populate_knowledge_base(conn, table_name)
+        populate_knowledge_base(cursor, table_name)
+        
+        # Index the articles once they are loaded
+        create_full_text_index(cursor, table_name)
         
         print("\n" + "=" * 80)
         print("✅ Knowledge base setup completed successfully!")
         print("=" * 80)
         
+        cursor.close()
         conn.close()
         return 0
         
@@ -19,21 +19,26 @@ Examples:
     python setup_orders_database.py --no-drop
     
     # Custom batch size
-    python setup_orders_database.py --batch-size 2000
+    python setup_orders_database.py --batch-size 10000
 
 Requirements:
     - MSSQL_CONNECTION_STRING environment variable must be set
     - ODBC Driver 18 for SQL Server must be installed
-    - pyodbc Python package must be installed
+    - pyodbc and numpy Python packages must be installed
 """
 
 import os
 import sys
+import copy
+import json
 import time
-import random
+import multiprocessing
+import queue
 import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, date
-from typing import List, Tuple, Dict
+from typing import Any, Callable, List, Tuple, Dict, Iterator, Optional
 
 try:
     import pyodbc
@@ -41,6 +46,12 @@ except ImportError:
     print("❌ Error: pyodbc is not installed. Please run: pip install pyodbc")
     sys.exit(1)
 
+try:
+    import numpy as np
+except ImportError:
+    print("❌ Error: numpy is not installed. Please run: pip install numpy")
+    sys.exit(1)
+
 try:
     from dotenv import load_dotenv
 except ImportError:
@@ -58,6 +69,31 @@ except ImportError:
 # Configuration
 # ============================================================================
 
+# Column order of the generated order tuples
+ORDER_COLUMNS = ["order_id", "status", "tracking", "estimated_delivery", "order_date"]
+
+# %-format template for order IDs and prefix of UPS-style tracking numbers
+ORDER_ID_FORMAT = "ORD-%05d"
+TRACKING_PREFIX = "1Z999AA10"
+
+# First tracking suffix, matching the example in customer_support_agent.py
+TRACKING_START = 123456784
+
+# pyodbc parameter types for ORDER_COLUMNS, matching the table definition.
+# Binding VARCHAR instead of pyodbc's default NVARCHAR sends the ASCII
+# strings as single-byte characters rather than UTF-16.
+ORDER_INPUT_SIZES = [
+    (pyodbc.SQL_VARCHAR, 20, 0),
+    (pyodbc.SQL_VARCHAR, 20, 0),
+    (pyodbc.SQL_VARCHAR, 50, 0),
+    (pyodbc.SQL_TYPE_DATE, 0, 0),
+    (pyodbc.SQL_TYPE_DATE, 0, 0),
+]
+
+# Order status options, matching those in customer_support_agent.py examples
+ORDER_STATUSES = ["shipped", "processing", "canceled", "returned", "refunded", "delivered"]
+
+
 class DatabaseConfig:
     """Configuration for database setup."""
 
@@ -66,6 +102,45 @@ class DatabaseConfig:
         self.table_name = table_name
 
 
+class AdaptiveBatchSizer:
+    """
+    Tune the insert batch size from an EWMA of measured insert throughput.
+
+    The batch grows by 25% while the smoothed rows/sec rate keeps improving
+    and is halved when it drops, within [min_size, max_size]. The bounds are
+    widened to include initial_size, so an explicit --batch-size outside
+    them is honoured rather than clamped.
+    """
+
+    def __init__(
+        self,
+        initial_size: int,
+        min_size: int = 500,
+        max_size: int = 50000,
+        smoothing: float = 0.3
+    ):
+        self.min_size = min(min_size, initial_size)
+        self.max_size = max(max_size, initial_size)
+        self.smoothing = smoothing
+        self.batch_size = initial_size
+        self.ewma_rate: Optional[float] = None
+
+    def record(self, rows: int, elapsed: float) -> None:
+        """Fold one batch's throughput into the EWMA and resize the next batch."""
+        instant_rate = rows / max(elapsed, 1e-6)
+        previous_rate = self.ewma_rate
+        if previous_rate is None:
+            self.ewma_rate = instant_rate
+        else:
+            self.ewma_rate = (1 - self.smoothing) * previous_rate + self.smoothing * instant_rate
+
+        if previous_rate is None or self.ewma_rate >= previous_rate:
+            # Grow by at least one row so small batches don't stall
+            self.batch_size = min(max(int(self.batch_size * 1.25), self.batch_size + 1), self.max_size)
+        else:
+            self.batch_size = max(self.batch_size // 2, self.min_size)
+
+
 # ============================================================================
 # Database Connection Management
 # ============================================================================
@@ -86,6 +161,8 @@ def connect_to_database(connection_string: str) -> pyodbc.Connection:
     try:
         conn = pyodbc.connect(connection_string)
         conn.autocommit = False  # Use transactions for batch inserts
+        # Suppress the per-statement rowcount messages in the TDS reply stream
+        conn.execute("SET NOCOUNT ON")
         return conn
     except pyodbc.Error as e:
         print(f"❌ Failed to connect to database: {e}")
@@ -96,38 +173,37 @@ def connect_to_database(connection_string: str) -> pyodbc.Connection:
 # Schema Management
 # ============================================================================
 
-def drop_table_if_exists(connection: pyodbc.Connection, table_name: str) -> None:
+def drop_table_if_exists(cursor: pyodbc.Cursor, table_name: str) -> None:
     """
     Drop table if it exists.
     
     Args:
-        connection: Database connection
+        cursor: Database cursor
         table_name: Name of table to drop
     """
-    cursor = connection.cursor()
     try:
         cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
-        connection.commit()
+        cursor.commit()
         print(f"✓ Dropped existing table '{table_name}'")
     except pyodbc.Error as e:
         print(f"⚠️  Warning: Could not drop table: {e}")
-        connection.rollback()
-    finally:
-        cursor.close()
+        cursor.rollback()
 
 
-def create_orders_table(connection: pyodbc.Connection, table_name: str) -> None:
+def create_orders_table(cursor: pyodbc.Cursor, table_name: str) -> None:
     """
-    Create orders table with proper schema and indexes.
+    Create orders table with its primary key.
+
+    Secondary indexes are created by create_orders_indexes() once the data
+    is loaded, so the bulk insert does not pay for index maintenance.
     
     Args:
-        connection: Database connection
+        cursor: Database cursor
         table_name: Name of table to create
     
     Raises:
         Exception: If table creation fails
     """
-    cursor = connection.cursor()
     try:
         # Create table
         create_sql = f"""
@@ -140,74 +216,107 @@ def create_orders_table(connection: pyodbc.Connection, table_name: str) -> None:
         )
         """
         cursor.execute(create_sql)
-        
+        cursor.commit()
+        print(f"✓ Created table '{table_name}'")
+    except pyodbc.Error as e:
+        cursor.rollback()
+        print(f"❌ Failed to create table: {e}")
+        raise
+
+
+def create_orders_indexes(cursor: pyodbc.Cursor, table_name: str) -> None:
+    """
+    Create secondary indexes on the orders table.
+
+    Building each index once over the loaded table is much cheaper than
+    maintaining it row by row during the bulk insert.
+    
+    Args:
+        cursor: Database cursor
+        table_name: Name of the populated table
+    
+    Raises:
+        Exception: If index creation fails
+    """
+    try:
         # Create indexes for better query performance
         cursor.execute(f"CREATE INDEX idx_order_date ON {table_name}(order_date)")
         cursor.execute(f"CREATE INDEX idx_status ON {table_name}(status)")
         cursor.execute(f"CREATE INDEX idx_tracking ON {table_name}(tracking)")
-        
-        connection.commit()
-        print(f"✓ Created table '{table_name}' with indexes")
+        cursor.commit()
+        print(f"✓ Created indexes on '{table_name}'")
     except pyodbc.Error as e:
-        connection.rollback()
-        print(f"❌ Failed to create table: {e}")
+        cursor.rollback()
+        print(f"❌ Failed to create indexes: {e}")
         raise
-    finally:
-        cursor.close()
 
 
-# ============================================================================
-# Data Generation Functions
-# ============================================================================
-
-def generate_order_id(sequence_num: int) -> str:
+def set_recovery_model(cursor: pyodbc.Cursor, recovery_model: str) -> Optional[str]:
     """
-    Generate order ID in format: ORD-00001 to ORD-999999
+    Switch the current database to another recovery model.
+
+    Under BULK_LOGGED, TABLOCK inserts and bulk copies into the new table are
+    minimally logged. Point-in-time restore is not possible for a log backup
+    that contains minimally logged operations, so the previous model should
+    be restored after the load. Requires ALTER permission on the database and
+    is not supported on Azure SQL Database.
 
     Args:
-        sequence_num: Sequential number (1-999999)
+        cursor: Database cursor
+        recovery_model: FULL, BULK_LOGGED or SIMPLE
 
     Returns:
-        str: Formatted order ID (e.g., "ORD-00001")
+        str: Previous recovery model, or None if it could not be changed
     """
-    return f"ORD-{sequence_num:05d}"
+    cursor.execute("SELECT recovery_model_desc FROM sys.databases WHERE name = DB_NAME()")
+    previous = cursor.fetchone()[0]
+    cursor.commit()
+    if previous == recovery_model:
+        return previous
+
+    # ALTER DATABASE cannot run inside a user transaction
+    connection = cursor.connection
+    connection.autocommit = True
+    try:
+        cursor.execute(f"ALTER DATABASE CURRENT SET RECOVERY {recovery_model}")
+        print(f"✓ Set recovery model to {recovery_model} (was {previous})")
+        return previous
+    except pyodbc.Error as e:
+        print(f"⚠️  Warning: Could not set recovery model to {recovery_model}: {e}")
+        return None
+    finally:
+        connection.autocommit = False
 
 
-def generate_tracking_number(sequence_num: int) -> str:
+# ============================================================================
+# Data Generation Functions
+# ============================================================================
+
+def generate_tracking_numbers_bulk(start_num: int, count: int) -> List[str]:
     """
-    Generate tracking number in UPS-style format: 1Z999AA10XXXXXXXXX
+    Generate consecutive tracking numbers in UPS-style format: 1Z999AA10XXXXXXXXX
 
     Pattern matches the examples in customer_support_agent.py:
     - "1Z999AA10123456784"
     - "1Z999AA10123456785"
 
-    Args:
-        sequence_num: Sequential number for uniqueness
-
-    Returns:
-        str: Formatted tracking number
-    """
-    # Start from 123456784 (matching the example in customer_support_agent.py)
-    tracking_suffix = 123456784 + sequence_num - 1
-    return f"1Z999AA10{tracking_suffix:09d}"
+    Suffixes start at TRACKING_START, which already has 9 digits, so plain
+    str() + prefix concatenation replaces %09d padding.
 
-
-def generate_random_status() -> str:
-    """
-    Randomly select order status with uniform distribution.
-
-    Status options match those in customer_support_agent.py examples.
+    Args:
+        start_num: Sequential number of the first order
+        count: Number of tracking numbers to generate
 
     Returns:
-        str: Random status value
+        list: Formatted tracking numbers
     """
-    statuses = ["shipped", "processing", "canceled", "returned", "refunded", "delivered"]
-    return random.choice(statuses)
+    suffix_start = TRACKING_START + start_num - 1
+    return list(map(TRACKING_PREFIX.__add__, map(str, range(suffix_start, suffix_start + count))))
 
 
-def calculate_order_dates(total_orders: int) -> List[date]:
+class OrderDateStream:
     """
-    Calculate order dates with realistic clustering.
+    Produce clustered order dates on demand, one batch at a time.
 
     Logic:
     - Start date: 3 years (1095 days) before today
@@ -215,75 +324,189 @@ def calculate_order_dates(total_orders: int) -> List[date]:
     - Then advance by 1 day
 
     This creates realistic clustering where multiple orders share the same date,
-    mimicking real-world e-commerce patterns.
+    mimicking real-world e-commerce patterns. Only the current date and the
+    number of orders left on it are kept between batches, so memory does not
+    grow with the total number of orders.
+    """
 
-    Args:
-        total_orders: Total number of orders to generate
+    def __init__(self, rng: np.random.Generator):
+        self.rng = rng
+        self.start_date = np.datetime64(datetime.now().date() - timedelta(days=1095), "D")
+        self.current_date = self.start_date
+        self.left_on_current_date = int(rng.integers(250, 301))
+        # Cluster sizes replayed instead of drawn, see split()
+        self._planned_sizes: Optional[np.ndarray] = None
+        self._planned_pos = 0
 
-    Returns:
-        list: List of order dates (one per order)
-    """
-    start_date = datetime.now().date() - timedelta(days=1095)
-    order_dates = []
-    current_date = start_date
-    orders_on_current_date = 0
-    orders_per_date = random.randint(250, 300)
+    def take(self, count: int) -> np.ndarray:
+        """
+        Return the next `count` order dates.
+
+        Args:
+            count: Number of dates to return
+
+        Returns:
+            np.ndarray: datetime64[D] array of order dates (one per order)
+        """
+        first_date = self.current_date
+        on_first_date, orders_per_date = self._advance(count)
+        current_dates = np.repeat(first_date, on_first_date)
+        if orders_per_date.size == 0:
+            return current_dates
+
+        new_dates = first_date + np.arange(1, orders_per_date.size + 1)
+        return np.concatenate([current_dates, np.repeat(new_dates, orders_per_date)])
 
-    for i in range(total_orders):
-        order_dates.append(current_date)
-        orders_on_current_date += 1
+    def split(self, count: int) -> "OrderDateStream":
+        """
+        Hand the next `count` order dates to a new stream and skip past them.
 
-        # Advance date after N orders
-        if orders_on_current_date >= orders_per_date:
-            current_date += timedelta(days=1)
-            orders_on_current_date = 0
-            orders_per_date = random.randint(250, 300)  # New random batch size
+        The new stream replays the cluster sizes drawn here instead of
+        drawing its own, so it ends exactly where this stream continues.
+        Only one size per day is kept, not the dates themselves.
 
-    return order_dates
+        Args:
+            count: Number of order dates covered by the new stream
 
+        Returns:
+            OrderDateStream: Stream for the next `count` orders
+        """
+        stream = copy.copy(self)
+        _, stream._planned_sizes = self._advance(count)
+        stream._planned_pos = 0
+        stream.rng = None
+        return stream
 
-def calculate_estimated_delivery(order_date: date) -> date:
+    def _advance(self, count: int) -> Tuple[int, np.ndarray]:
+        """
+        Move `count` orders forward.
+
+        Returns:
+            tuple: Orders on the date current before the call, and the order
+                count for each following day
+        """
+        # Finish the current date's cluster first
+        on_current_date = min(count, self.left_on_current_date)
+        self.left_on_current_date -= on_current_date
+        remaining = count - on_current_date
+        if remaining == 0:
+            return on_current_date, np.empty(0, dtype=np.int64)
+
+        # Draw one cluster size per following day, enough to cover the rest,
+        # keep only the days needed and carry the last day's unused orders over
+        if self._planned_sizes is None:
+            orders_per_date = self.rng.integers(250, 301, size=remaining // 250 + 1)
+        else:
+            orders_per_date = self._planned_sizes[self._planned_pos:self._planned_pos + remaining // 250 + 1]
+        cumulative = np.cumsum(orders_per_date)
+        num_dates = int(np.searchsorted(cumulative, remaining)) + 1
+        orders_per_date = orders_per_date[:num_dates].copy()
+        self._planned_pos += num_dates
+        self.left_on_current_date = int(cumulative[num_dates - 1]) - remaining
+        orders_per_date[-1] -= self.left_on_current_date
+
+        self.current_date = self.current_date + num_dates
+        return on_current_date, orders_per_date
+
+
+def generate_order_columns(
+    start_num: int,
+    batch_dates: np.ndarray,
+    rng: np.random.Generator
+) -> Dict[str, Any]:
     """
-    Calculate estimated delivery date.
+    Generate a batch of orders as columns.
+
+    IDs and tracking numbers are formatted in one pass over the batch's
+    number range; statuses and delivery dates are drawn for the whole batch
+    at once with NumPy instead of one random call per row. Dates stay
+    datetime64[D] arrays, so no Python date objects are created here.
 
     Args:
-        order_date: Order creation date
+        start_num: Starting order number
+        batch_dates: datetime64[D] array with one order date per order in batch
+        rng: Random number generator
 
     Returns:
-        date: Estimated delivery date (order_date + 1-15 days)
+        dict: Column name (see ORDER_COLUMNS) to list or NumPy array
     """
-    days_to_delivery = random.randint(1, 15)
-    return order_date + timedelta(days=days_to_delivery)
+    batch_size = len(batch_dates)
+    return {
+        # Map the bound %-format over the range so the template is parsed once per batch
+        "order_id": list(map(ORDER_ID_FORMAT.__mod__, range(start_num, start_num + batch_size))),
+        "status": rng.choice(ORDER_STATUSES, size=batch_size),
+        "tracking": generate_tracking_numbers_bulk(start_num, batch_size),
+        # Estimated delivery is order_date + 1-15 days
+        "estimated_delivery": batch_dates + rng.integers(1, 16, size=batch_size).astype("timedelta64[D]"),
+        "order_date": batch_dates,
+    }
 
 
 def generate_order_batch(
     start_num: int,
-    batch_size: int,
-    order_dates: List[date]
+    batch_dates: np.ndarray,
+    rng: np.random.Generator
 ) -> List[Tuple[str, str, str, date, date]]:
     """
-    Generate a batch of orders.
+    Generate a batch of orders as row tuples for pyodbc.
 
     Args:
         start_num: Starting order number
-        batch_size: Number of orders in batch
-        order_dates: Pre-calculated list of order dates
+        batch_dates: datetime64[D] array with one order date per order in batch
+        rng: Random number generator
 
     Returns:
         list: List of tuples (order_id, status, tracking, est_delivery, order_date)
     """
-    batch = []
-    for i in range(batch_size):
-        order_num = start_num + i
-        order_id = generate_order_id(order_num)
-        status = generate_random_status()
-        tracking = generate_tracking_number(order_num)
-        order_date = order_dates[order_num - 1]
-        estimated_delivery = calculate_estimated_delivery(order_date)
+    columns = generate_order_columns(start_num, batch_dates, rng)
+    # tolist() converts to str and datetime.date in C, once at the pyodbc boundary
+    return list(zip(
+        columns["order_id"],
+        columns["status"].tolist(),
+        columns["tracking"],
+        columns["estimated_delivery"].tolist(),
+        columns["order_date"].tolist()
+    ))
+
+
+def iter_order_batches(
+    total_orders: int,
+    batch_size: int,
+    order_dates: OrderDateStream,
+    rng: np.random.Generator,
+    sizer: Optional[AdaptiveBatchSizer] = None,
+    columnar: bool = False,
+    first_order_num: int = 1
+) -> Iterator[Any]:
+    """
+    Lazily generate all orders in batches.
 
-        batch.append((order_id, status, tracking, estimated_delivery, order_date))
+    Each batch, including its order dates, is generated only when the
+    previous one has been consumed, so at most one batch is alive at a time.
 
-    return batch
+    Args:
+        total_orders: Total number of orders to generate
+        batch_size: Number of orders per batch
+        order_dates: Order date stream, advanced in lockstep with the batches
+        rng: Random number generator
+        sizer: If given, its current batch_size is used for each batch
+            instead of the fixed batch_size
+        columnar: Yield generate_order_columns() dicts instead of row tuples
+        first_order_num: Order number of the first generated order
+
+    Yields:
+        Batch of order tuples, or column dict if columnar (the last batch
+        may be smaller)
+    """
+    make_batch = generate_order_columns if columnar else generate_order_batch
+    batch_start = first_order_num
+    end = first_order_num + total_orders
+    while batch_start < end:
+        if sizer is not None:
+            batch_size = sizer.batch_size
+        current_batch_size = min(batch_size, end - batch_start)
+        yield make_batch(batch_start, order_dates.take(current_batch_size), rng)
+        batch_start += current_batch_size
 
 
 # ============================================================================
@@ -291,17 +514,24 @@ def generate_order_batch(
 # ============================================================================
 
 def insert_orders_batch(
-    connection: pyodbc.Connection,
+    cursor: pyodbc.Cursor,
     table_name: str,
-    orders_batch: List[Tuple[str, str, str, date, date]]
+    orders_batch: List[Tuple[str, str, str, date, date]],
+    table_lock: bool = True
 ) -> int:
     """
     Insert a batch of orders using parameterized query.
 
+    By default the insert takes a table lock, which lets SQL Server minimally
+    log the load into the freshly created table. The caller is responsible
+    for committing.
+
     Args:
-        connection: Database connection
+        cursor: Database cursor with fast_executemany enabled
         table_name: Target table name
         orders_batch: List of order tuples
+        table_lock: Whether to insert WITH (TABLOCK); disable when several
+            connections insert concurrently
 
     Returns:
         int: Number of rows inserted
@@ -309,38 +539,406 @@ def insert_orders_batch(
     Raises:
         Exception: If batch insert fails
     """
-    cursor = connection.cursor()
     try:
+        table_hint = " WITH (TABLOCK)" if table_lock else ""
         insert_sql = f"""
-        INSERT INTO {table_name}
+        INSERT INTO {table_name}{table_hint}
         (order_id, status, tracking, estimated_delivery, order_date)
         VALUES (?, ?, ?, ?, ?)
         """
+        cursor.setinputsizes(ORDER_INPUT_SIZES)
         cursor.executemany(insert_sql, orders_batch)
-        connection.commit()
         return len(orders_batch)
     except pyodbc.Error as e:
-        connection.rollback()
+        cursor.rollback()
         print(f"❌ Batch insert failed: {e}")
         raise
+
+
+def insert_orders_batch_json(
+    cursor: pyodbc.Cursor,
+    table_name: str,
+    orders_batch: List[Tuple[str, str, str, date, date]],
+    table_lock: bool = True
+) -> int:
+    """
+    Insert a batch of orders as a single JSON parameter expanded by OPENJSON.
+
+    The whole batch travels as one NVARCHAR(MAX) value in a single statement,
+    so it does not depend on the driver's parameter array support and is not
+    bound by SQL Server's 2100 parameter limit. Requires SQL Server 2016+.
+
+    Args:
+        cursor: Database cursor
+        table_name: Target table name
+        orders_batch: List of order tuples
+        table_lock: Whether to insert WITH (TABLOCK)
+
+    Returns:
+        int: Number of rows inserted
+
+    Raises:
+        Exception: If batch insert fails
+    """
+    try:
+        table_hint = " WITH (TABLOCK)" if table_lock else ""
+        insert_sql = f"""
+        INSERT INTO {table_name}{table_hint}
+        (order_id, status, tracking, estimated_delivery, order_date)
+        SELECT order_id, status, tracking, estimated_delivery, order_date
+        FROM OPENJSON(?) WITH (
+            order_id VARCHAR(20) '$[0]',
+            status VARCHAR(20) '$[1]',
+            tracking VARCHAR(50) '$[2]',
+            estimated_delivery DATE '$[3]',
+            order_date DATE '$[4]'
+        )
+        """
+        payload = json.dumps(orders_batch, default=date.isoformat, separators=(",", ":"))
+        cursor.execute(insert_sql, payload)
+        return len(orders_batch)
+    except pyodbc.Error as e:
+        cursor.rollback()
+        print(f"❌ Batch insert failed: {e}")
+        raise
+
+
+def insert_batches_concurrently(
+    connection_string: str,
+    table_name: str,
+    batches: Iterator[List[Tuple[str, str, str, date, date]]],
+    workers: int,
+    insert_batch: Callable[..., int] = insert_orders_batch
+) -> Iterator[int]:
+    """
+    Insert batches over several connections while the next ones are generated.
+
+    Each worker thread borrows its own pyodbc connection (connections are not
+    thread-safe) and commits every batch, so the workers never wait on each
+    other's locks. At most `workers` batches are in flight at a time.
+
+    Args:
+        connection_string: ODBC connection string
+        table_name: Target table name
+        batches: Iterator of order batches
+        workers: Number of concurrent inserter connections
+        insert_batch: Batch insert function, e.g. insert_orders_batch_json
+
+    Yields:
+        int: Number of rows inserted per batch, in submission order
+    """
+    connections = [connect_to_database(connection_string) for _ in range(workers)]
+    idle_cursors = queue.Queue()
+    for conn in connections:
+        cursor = conn.cursor()
+        cursor.fast_executemany = True
+        idle_cursors.put(cursor)
+
+    def insert(batch: List[Tuple[str, str, str, date, date]]) -> int:
+        cursor = idle_cursors.get()
+        try:
+            inserted = insert_batch(cursor, table_name, batch, table_lock=False)
+            cursor.commit()
+            return inserted
+        finally:
+            idle_cursors.put(cursor)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            in_flight = deque()
+            for batch in batches:
+                if len(in_flight) >= workers:
+                    yield in_flight.popleft().result()
+                in_flight.append(executor.submit(insert, batch))
+            while in_flight:
+                yield in_flight.popleft().result()
     finally:
-        cursor.close()
+        for conn in connections:
+            conn.close()
+
+
+def insert_batches_adaptively(
+    cursor: pyodbc.Cursor,
+    table_name: str,
+    batches: Iterator[List[Tuple[str, str, str, date, date]]],
+    sizer: AdaptiveBatchSizer,
+    insert_batch: Callable[..., int] = insert_orders_batch
+) -> Iterator[int]:
+    """
+    Insert batches while feeding each batch's timing back into the sizer.
+
+    `batches` should be produced by iter_order_batches() with the same sizer,
+    so every new batch uses the size chosen from the previous insert.
+
+    Args:
+        cursor: Database cursor
+        table_name: Target table name
+        batches: Iterator of order batches
+        sizer: Adaptive batch sizer
+        insert_batch: Batch insert function, e.g. insert_orders_batch_json
+
+    Yields:
+        int: Number of rows inserted per batch
+    """
+    for batch in batches:
+        batch_start_time = time.perf_counter()
+        inserted = insert_batch(cursor, table_name, batch)
+        sizer.record(inserted, time.perf_counter() - batch_start_time)
+        yield inserted
+
+
+# Shared inserted-row counter, set in each worker process by _init_load_worker()
+_progress_counter = None
+
+
+def _init_load_worker(counter) -> None:
+    global _progress_counter
+    _progress_counter = counter
+
+
+def _load_order_range(
+    connection_string: str,
+    table_name: str,
+    first_order_num: int,
+    total_orders: int,
+    batch_size: int,
+    order_dates: OrderDateStream,
+    rng: np.random.Generator,
+    insert_batch: Callable[..., int]
+) -> int:
+    """Generate and insert one contiguous range of orders in a worker process."""
+    conn = connect_to_database(connection_string)
+    try:
+        cursor = conn.cursor()
+        cursor.fast_executemany = True
+        range_inserted = 0
+        for batch in iter_order_batches(
+            total_orders, batch_size, order_dates, rng, first_order_num=first_order_num
+        ):
+            inserted = insert_batch(cursor, table_name, batch, table_lock=False)
+            cursor.commit()
+            range_inserted += inserted
+            with _progress_counter.get_lock():
+                _progress_counter.value += inserted
+        return range_inserted
+    finally:
+        conn.close()
+
+
+def insert_ranges_in_processes(
+    connection_string: str,
+    table_name: str,
+    total_orders: int,
+    batch_size: int,
+    order_dates: OrderDateStream,
+    processes: int,
+    insert_batch: Callable[..., int] = insert_orders_batch
+) -> Iterator[int]:
+    """
+    Generate and insert orders in several processes, one order range each.
+
+    The order numbers are split into `processes` contiguous ranges. Each
+    worker process opens its own connection and both generates and inserts
+    its range, so generation is not serialized by the GIL. The parent
+    splits the date stream at each range boundary, which keeps the dates
+    continuous across ranges, and leaves `order_dates` at the end of the
+    last range.
+
+    Args:
+        connection_string: ODBC connection string
+        table_name: Target table name
+        total_orders: Total number of orders to generate
+        batch_size: Number of orders per batch
+        order_dates: Order date stream positioned at the first order
+        processes: Number of worker processes
+        insert_batch: Batch insert function, e.g. insert_orders_batch_json
+
+    Yields:
+        int: Number of rows inserted since the previous yield
+    """
+    range_size = -(-total_orders // processes)
+    seeds = np.random.SeedSequence().spawn(processes)
+    tasks = []
+    for seed, first_order_num in zip(seeds, range(1, total_orders + 1, range_size)):
+        range_orders = min(range_size, total_orders + 1 - first_order_num)
+        tasks.append((
+            connection_string,
+            table_name,
+            first_order_num,
+            range_orders,
+            batch_size,
+            order_dates.split(range_orders),
+            np.random.default_rng(seed),
+            insert_batch
+        ))
+
+    counter = multiprocessing.Value("q", 0)
+    reported = 0
+    with multiprocessing.Pool(processes, initializer=_init_load_worker, initargs=(counter,)) as pool:
+        result = pool.starmap_async(_load_order_range, tasks)
+        while not result.ready():
+            result.wait(0.1)
+            done = counter.value
+            if done > reported:
+                yield done - reported
+                reported = done
+        # Re-raise the first worker error, if any
+        result.get()
+
+    if counter.value > reported:
+        yield counter.value - reported
+
+
+def parse_odbc_connection_string(connection_string: str) -> List[Tuple[str, str]]:
+    """
+    Split an ODBC connection string into (keyword, value) pairs.
+
+    Values may be wrapped in braces to hold ';' or other special characters,
+    with '}}' standing for a literal '}'. The braces are removed.
+
+    Args:
+        connection_string: ODBC connection string
+
+    Returns:
+        list: (keyword, value) pairs in order
+    """
+    pairs = []
+    i, n = 0, len(connection_string)
+    while i < n:
+        eq = connection_string.find("=", i)
+        if eq == -1:
+            break
+        semi = connection_string.find(";", i)
+        if semi != -1 and semi < eq:
+            # Segment without '=', e.g. a stray ';;'
+            i = semi + 1
+            continue
+        key = connection_string[i:eq].strip()
+        i = eq + 1
+        while i < n and connection_string[i].isspace():
+            i += 1
+
+        if i < n and connection_string[i] == "{":
+            chars = []
+            i += 1
+            while i < n:
+                if connection_string[i] == "}":
+                    if connection_string.startswith("}}", i):
+                        chars.append("}")
+                        i += 2
+                        continue
+                    i += 1
+                    break
+                chars.append(connection_string[i])
+                i += 1
+            value = "".join(chars)
+            end = connection_string.find(";", i)
+            i = n if end == -1 else end + 1
+        else:
+            end = connection_string.find(";", i)
+            end = n if end == -1 else end
+            value = connection_string[i:end].strip()
+            i = end + 1
+
+        if key:
+            pairs.append((key, value))
+    return pairs
+
+
+def quote_sqlclient_value(value: str) -> str:
+    """Double-quote a SqlClient connection string value if it needs it."""
+    if any(c in value for c in ';"\'') or value != value.strip():
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def odbc_to_sqlclient_connection_string(connection_string: str) -> str:
+    """
+    Convert an ODBC connection string to Microsoft.Data.SqlClient format.
+
+    Args:
+        connection_string: ODBC connection string
+
+    Returns:
+        str: Equivalent SqlClient connection string
+    """
+    # ODBC keywords that are spelled differently (or absent) in SqlClient
+    renames = {"uid": "User ID", "pwd": "Password", "driver": None}
+    parts = []
+    for key, value in parse_odbc_connection_string(connection_string):
+        key = renames.get(key.lower(), key)
+        if key is None:
+            continue
+        if value.lower() in ("yes", "no"):
+            value = "True" if value.lower() == "yes" else "False"
+        parts.append(f"{key}={quote_sqlclient_value(value)}")
+    return ";".join(parts) + ";"
+
+
+def bulk_copy_orders_batch(
+    sqlclient_connection_string: str,
+    table_name: str,
+    order_columns: Dict[str, Any]
+) -> int:
+    """
+    Insert a batch of orders with SqlBulkCopy via arrowsqlbcpy.
+
+    Rows are streamed through .NET's native bulk copy instead of bound as
+    INSERT parameters. The datetime64 date columns go into the DataFrame
+    as-is. Requires the optional arrowsqlbcpy and pandas packages and a
+    .NET runtime.
+
+    Args:
+        sqlclient_connection_string: SqlClient-format connection string
+        table_name: Target table name
+        order_columns: Batch from generate_order_columns()
+
+    Returns:
+        int: Number of rows inserted
+    """
+    import pandas as pd
+    from arrowsqlbcpy import bulkcopy_from_pandas
+
+    df = pd.DataFrame(order_columns, columns=ORDER_COLUMNS)
+    bulkcopy_from_pandas(df, sqlclient_connection_string, table_name)
+    return len(df)
 
 
 def populate_database(
-    connection: pyodbc.Connection,
+    cursor: pyodbc.Cursor,
     table_name: str,
     total_orders: int,
-    batch_size: int
+    batch_size: int,
+    bulk_copy_connection_string: Optional[str] = None,
+    connection_string: Optional[str] = None,
+    workers: int = 1,
+    json_insert: bool = False,
+    adaptive_batch_size: bool = False,
+    processes: int = 1
 ) -> Dict[str, any]:
     """
     Populate database with generated orders.
 
+    With a single worker all batches are inserted in one transaction that is
+    committed once the load has finished. With several workers, batches are
+    inserted concurrently by insert_batches_concurrently(); with several
+    processes, order ranges are generated and inserted by
+    insert_ranges_in_processes().
+
     Args:
-        connection: Database connection
+        cursor: Database cursor
         table_name: Target table name
         total_orders: Total number of orders to generate
         batch_size: Number of orders per batch
+        bulk_copy_connection_string: SqlClient connection string; if set,
+            batches are loaded with SqlBulkCopy instead of pyodbc
+        connection_string: ODBC connection string for the worker connections
+        workers: Number of concurrent inserter connections
+        json_insert: Insert each batch as one OPENJSON statement instead of
+            a fast_executemany parameter array
+        adaptive_batch_size: Tune the batch size from measured throughput,
+            starting at batch_size (single pyodbc connection only)
+        processes: Number of worker processes, each with its own connection
 
     Returns:
         dict: Summary statistics including:
@@ -352,14 +950,18 @@ def populate_database(
     """
     print(f"\n📊 Generating {total_orders:,} orders...")
 
-    # Pre-calculate all order dates for consistency
-    print("📅 Calculating order dates...")
-    order_dates = calculate_order_dates(total_orders)
+    rng = np.random.default_rng()
+    order_dates = OrderDateStream(rng)
+
+    # Bind each batch as a single parameter array instead of one round trip per row
+    cursor.fast_executemany = True
+
+    insert_batch = insert_orders_batch_json if json_insert else insert_orders_batch
 
     start_time = time.time()
     total_inserted = 0
 
-    # Create progress bar with forced updates
+    # Create progress bar, redrawn at most 10 times per second
     print("\n🔄 Starting batch insertion with progress tracking...\n")
 
     with tqdm(
@@ -367,39 +969,50 @@ def populate_database(
         desc="Inserting orders",
         unit=" orders",
         unit_scale=False,
-        mininterval=0,
-        maxinterval=0,
-        miniters=1,
+        mininterval=0.1,
+        maxinterval=1.0,
         dynamic_ncols=True,
         bar_format="{desc}: {percentage:3.0f}%|{bar}| {n:,}/{total:,} [{elapsed}<{remaining}, {rate_fmt}]"
     ) as pbar:
-        # Process in batches
-        for batch_start in range(1, total_orders + 1, batch_size):
-            batch_end = min(batch_start + batch_size, total_orders + 1)
-            current_batch_size = batch_end - batch_start
-
-            # Generate batch
-            batch = generate_order_batch(batch_start, current_batch_size, order_dates)
-
-            # Insert batch
-            inserted = insert_orders_batch(connection, table_name, batch)
+        # Process in batches, generating each one just before it is inserted
+        sizer = None
+        if adaptive_batch_size and workers <= 1 and processes <= 1 and not bulk_copy_connection_string:
+            sizer = AdaptiveBatchSizer(batch_size)
+        batches = iter_order_batches(
+            total_orders, batch_size, order_dates, rng, sizer, columnar=bool(bulk_copy_connection_string)
+        )
+        if bulk_copy_connection_string:
+            inserted_counts = (
+                bulk_copy_orders_batch(bulk_copy_connection_string, table_name, batch) for batch in batches
+            )
+        elif processes > 1:
+            inserted_counts = insert_ranges_in_processes(
+                connection_string, table_name, total_orders, batch_size, order_dates, processes, insert_batch
+            )
+        elif workers > 1:
+            inserted_counts = insert_batches_concurrently(
+                connection_string, table_name, batches, workers, insert_batch
+            )
+        elif sizer is not None:
+            inserted_counts = insert_batches_adaptively(cursor, table_name, batches, sizer, insert_batch)
+        else:
+            inserted_counts = (insert_batch(cursor, table_name, batch) for batch in batches)
+
+        for inserted in inserted_counts:
             total_inserted += inserted
 
-            # Update progress bar with explicit refresh
             pbar.update(inserted)
-            pbar.refresh()
 
-            # Force stdout flush to ensure display updates
-            sys.stdout.flush()
+    cursor.commit()
 
     elapsed_time = time.time() - start_time
 
     return {
         "total_inserted": total_inserted,
         "elapsed_time": elapsed_time,
-        "start_date": order_dates[0],
-        "end_date": order_dates[-1],
-        "date_span_days": (order_dates[-1] - order_dates[0]).days
+        "start_date": order_dates.start_date.item(),
+        "end_date": order_dates.current_date.item(),
+        "date_span_days": (order_dates.current_date - order_dates.start_date).item().days
     }
 
 
@@ -407,6 +1020,14 @@ def populate_database(
 # Main Execution
 # ============================================================================
 
+def positive_int(value: str) -> int:
+    """argparse type for counts and sizes that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
 def parse_arguments() -> argparse.Namespace:
     """
     Parse command-line arguments.
@@ -429,10 +1050,22 @@ Examples:
   python setup_orders_database.py --no-drop
 
   # Custom batch size
-  python setup_orders_database.py --batch-size 2000
+  python setup_orders_database.py --batch-size 10000
 
   # Full custom configuration
   python setup_orders_database.py --num-orders 250000 --batch-size 5000 --table-name customer_orders
+
+  # Insert over 4 concurrent connections
+  python setup_orders_database.py --num-orders 1000000 --workers 4
+
+  # Generate and insert in 8 processes
+  python setup_orders_database.py --num-orders 5000000 --processes 8
+
+  # Expand each batch server-side with OPENJSON
+  python setup_orders_database.py --num-orders 1000000 --batch-size 20000 --json-insert
+
+  # Load through SqlBulkCopy (pip install arrowsqlbcpy pandas)
+  python setup_orders_database.py --num-orders 1000000 --batch-size 50000 --bulk-copy
         """
     )
 
@@ -444,9 +1077,9 @@ Examples:
     )
     parser.add_argument(
         "--batch-size",
-        type=int,
-        default=100,
-        help="Batch size for inserts (default: 100)"
+        type=positive_int,
+        default=5000,
+        help="Batch size for inserts (default: 5000)"
     )
     parser.add_argument(
         "--table-name",
@@ -459,6 +1092,44 @@ Examples:
         action="store_true",
         help="Do not drop existing table (default: drop and recreate)"
     )
+    parser.add_argument(
+        "--bulk-logged",
+        action="store_true",
+        help="Switch the database to BULK_LOGGED recovery during the load so it is minimally "
+             "logged, then restore the previous model. Breaks point-in-time restore for the "
+             "log backup covering the load"
+    )
+    parser.add_argument(
+        "--bulk-copy",
+        action="store_true",
+        help="Load rows with SqlBulkCopy via arrowsqlbcpy (requires: pip install arrowsqlbcpy pandas, "
+             "and a .NET runtime). Use a large --batch-size, e.g. 50000"
+    )
+    parser.add_argument(
+        "--workers",
+        type=positive_int,
+        default=1,
+        help="Number of concurrent insert connections; ignored with --bulk-copy (default: 1)"
+    )
+    parser.add_argument(
+        "--processes",
+        type=positive_int,
+        default=1,
+        help="Number of worker processes that each generate and insert a range of orders over "
+             "their own connection; takes precedence over --workers, ignored with --bulk-copy (default: 1)"
+    )
+    parser.add_argument(
+        "--json-insert",
+        action="store_true",
+        help="Send each batch as one JSON parameter expanded server-side with OPENJSON "
+             "(SQL Server 2016+), instead of a fast_executemany parameter array"
+    )
+    parser.add_argument(
+        "--adaptive-batch-size",
+        action="store_true",
+        help="Grow or shrink the batch size from measured insert throughput, starting at "
+             "--batch-size; ignored with --workers, --processes or --bulk-copy"
+    )
 
     return parser.parse_args()
 
@@ -491,28 +1162,66 @@ def main() -> int:
     print(f"  - Batch size: {args.batch_size:,}")
     print(f"  - Table name: {args.table_name}")
     print(f"  - Drop existing table: {not args.no_drop}")
+    print(f"  - Bulk-logged recovery: {args.bulk_logged}")
+    print(f"  - Bulk copy: {args.bulk_copy}")
+    print(f"  - Workers: {args.workers}")
+    print(f"  - Processes: {args.processes}")
+    print(f"  - JSON insert: {args.json_insert}")
+    print(f"  - Adaptive batch size: {args.adaptive_batch_size}")
     print("=" * 80)
 
+    bulk_copy_connection_string = None
+    if args.bulk_copy:
+        try:
+            import pandas  # noqa: F401
+            import arrowsqlbcpy  # noqa: F401
+        except ImportError:
+            print("❌ Error: --bulk-copy requires arrowsqlbcpy and pandas. Please run: pip install arrowsqlbcpy pandas")
+            return 1
+        bulk_copy_connection_string = odbc_to_sqlclient_connection_string(connection_string)
+
     try:
         # Connect to database
         print("\n🔌 Connecting to database...")
         conn = connect_to_database(connection_string)
+        cursor = conn.cursor()
         print("✓ Connected successfully")
 
         # Drop table if requested
         if not args.no_drop:
-            drop_table_if_exists(conn, args.table_name)
+            drop_table_if_exists(cursor, args.table_name)
 
         # Create table
-        create_orders_table(conn, args.table_name)
+        create_orders_table(cursor, args.table_name)
+
+        # Minimally log the load if requested
+        previous_recovery_model = None
+        if args.bulk_logged:
+            previous_recovery_model = set_recovery_model(cursor, "BULK_LOGGED")
 
         # Populate database
-        summary = populate_database(
-            conn,
-            args.table_name,
-            args.num_orders,
-            args.batch_size
-        )
+        try:
+            summary = populate_database(
+                cursor,
+                args.table_name,
+                args.num_orders,
+                args.batch_size,
+                bulk_copy_connection_string,
+                connection_string,
+                args.workers,
+                args.json_insert,
+                args.adaptive_batch_size,
+                args.processes
+            )
+
+            # Build indexes after the bulk load
+            print("\n🗂️  Creating indexes...")
+            create_orders_indexes(cursor, args.table_name)
+        finally:
+            if previous_recovery_model not in (None, "BULK_LOGGED"):
+                # Discard any partial load left open by an interrupted run
+                cursor.rollback()
+                set_recovery_model(cursor, previous_recovery_model)
 
         # Print summary
         print("\n" + "=" * 80)
@@ -526,6 +1235,7 @@ def main() -> int:
         print("=" * 80)
 
         # Close connection
+        cursor.close()
         conn.close()
         print("\n✓ Database connection closed")
 
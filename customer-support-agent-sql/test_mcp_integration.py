@@ -6,158 +6,116 @@ by directly calling the MCP tools and verifying the responses.
 
 Usage:
     python test_mcp_integration.py
+    pytest test_mcp_integration.py
 """
 
 import os
 import sys
 import json
-import subprocess
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from typing import Dict, Any
 
-# Add parent directory to path to import from customer_support_agent
+# Add parent directory to path to import the agent's MCP session
 sys.path.insert(0, os.path.dirname(__file__))
 
 from dotenv import load_dotenv
 load_dotenv()
 
+from mcp_session import MCPSession
+
+try:
+    import pytest
+except ImportError:
+    pytest = None
+
 # MCP Server Configuration
 MCP_SERVER_PATH = os.path.join(os.path.dirname(__file__), "MssqlMcp", "Node", "dist", "index.js")
 
-def call_mcp_tool(tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+
+def call_tool(client: MCPSession, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Call an MCP server tool via stdio communication.
+    Call an MCP server tool over the shared session and print the exchange.
 
     Args:
+        client: MCP session shared by all tests
         tool_name: Name of the MCP tool to call
         arguments: Arguments to pass to the tool
 
     Returns:
         Tool execution result as a dictionary
     """
+    print(f"\n📤 Sending request to MCP server:")
+    print(f"   Tool: {tool_name}")
+    print(f"   Arguments: {json.dumps(arguments, indent=2)}")
+
     try:
-        print(f"\n📤 Sending request to MCP server:")
-        print(f"   Tool: {tool_name}")
-        print(f"   Arguments: {json.dumps(arguments, indent=2)}")
-
-        # Prepare environment variables for MCP server
-        # The MCP server will inherit these environment variables
-        env = os.environ.copy()
-
-        # Prepare the MCP request
-        request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "tools/call",
-            "params": {
-                "name": tool_name,
-                "arguments": arguments
-            }
-        }
-
-        # Call the MCP server via Node.js
-        process = subprocess.Popen(
-            ["node", MCP_SERVER_PATH],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            env=env  # Pass environment variables to MCP server
-        )
-
-        # Send request and get response (60 second timeout for database connection)
-        stdout, stderr = process.communicate(input=json.dumps(request) + "\n", timeout=60)
-
-        if stderr:
-            print(f"   ⚠️  MCP Server stderr:")
-            for line in stderr.split('\n'):
-                if line.strip():
-                    print(f"      {line}")
-        
-        # Parse response
-        if stdout:
-            lines = stdout.strip().split("\n")
-            for line in lines:
-                try:
-                    response = json.loads(line)
-                    if "result" in response:
-                        # Extract the text content from MCP response
-                        if "content" in response["result"] and len(response["result"]["content"]) > 0:
-                            content_text = response["result"]["content"][0].get("text", "{}")
-                            result = json.loads(content_text)
-                            print(f"📥 Received response:")
-                            print(f"   Success: {result.get('success')}")
-                            print(f"   Message: {result.get('message', 'N/A')}")
-                            if result.get('data'):
-                                print(f"   Data: {json.dumps(result['data'][:2], indent=2)}...")  # Show first 2 records
-                            return result
-                        return response["result"]
-                except json.JSONDecodeError:
-                    continue
-        
-        return {"success": False, "message": "No valid response from MCP server"}
-        
-    except subprocess.TimeoutExpired:
-        process.kill()
+        # 60 second timeout for database connection
+        result = client.call(tool_name, arguments, timeout=60)
+    except FuturesTimeoutError:
         return {"success": False, "message": "MCP server call timed out"}
     except Exception as e:
         return {"success": False, "message": f"Error calling MCP server: {str(e)}"}
 
+    print(f"📥 Received response:")
+    print(f"   Success: {result.get('success')}")
+    print(f"   Message: {result.get('message', 'N/A')}")
+    if result.get('data'):
+        print(f"   Data: {json.dumps(result['data'][:2], indent=2)}...")  # Show first 2 records
+    return result
+
+
+if pytest is not None:
+    @pytest.fixture(scope="module")
+    def client():
+        """One MCP server process shared by all tests when run under pytest."""
+        if not os.path.exists(MCP_SERVER_PATH):
+            pytest.skip(f"MCP server not found at {MCP_SERVER_PATH}")
+        session = MCPSession(MCP_SERVER_PATH)
+        try:
+            yield session
+        finally:
+            session.close()
+
 
-def test_list_tables():
+def test_list_tables(client: MCPSession):
     """Test listing tables in the database."""
     print("\n" + "="*80)
     print("TEST 1: List Tables")
     print("="*80)
     
-    result = call_mcp_tool("list_table", {"parameters": []})
+    result = call_tool(client, "list_table", {"parameters": []})
     
-    if result.get("success"):
-        print("✅ Test passed: Successfully listed tables")
-        return True
-    else:
-        print(f"❌ Test failed: {result.get('message')}")
-        return False
+    assert result.get("success"), f"Failed to list tables: {result.get('message')}"
+    print("✅ Test passed: Successfully listed tables")
 
 
-def test_read_orders():
+def test_read_orders(client: MCPSession):
     """Test reading from the orders table."""
     print("\n" + "="*80)
     print("TEST 2: Read Orders")
     print("="*80)
     
     query = "SELECT TOP 5 order_id, status, tracking, estimated_delivery FROM orders"
-    result = call_mcp_tool("read_data", {"query": query})
+    result = call_tool(client, "read_data", {"query": query})
     
-    if result.get("success") and result.get("data"):
-        print(f"✅ Test passed: Retrieved {len(result['data'])} orders")
-        return True
-    else:
-        print(f"❌ Test failed: {result.get('message')}")
-        return False
+    assert result.get("success") and result.get("data"), f"Failed to read orders: {result.get('message')}"
+    print(f"✅ Test passed: Retrieved {len(result['data'])} orders")
 
 
-def test_read_knowledge_base():
+def test_read_knowledge_base(client: MCPSession):
     """Test reading from the knowledge_base table."""
     print("\n" + "="*80)
     print("TEST 3: Read Knowledge Base")
     print("="*80)
     
     query = "SELECT keyword, article FROM knowledge_base WHERE keyword = 'return'"
-    result = call_mcp_tool("read_data", {"query": query})
+    result = call_tool(client, "read_data", {"query": query})
     
-    if result.get("success"):
-        if result.get("data") and len(result["data"]) > 0:
-            print(f"✅ Test passed: Found knowledge base article")
-            return True
-        else:
-            print("⚠️  Warning: knowledge_base table exists but is empty")
-            print("   Run: python setup_knowledge_base.py")
-            return False
-    else:
-        print(f"⚠️  Warning: knowledge_base table may not exist")
-        print(f"   Message: {result.get('message')}")
-        print("   Run: python setup_knowledge_base.py")
-        return False
+    assert result.get("success"), \
+        f"knowledge_base table may not exist ({result.get('message')}). Run: python setup_knowledge_base.py"
+    assert result.get("data"), \
+        "knowledge_base table exists but is empty. Run: python setup_knowledge_base.py"
+    print(f"✅ Test passed: Found knowledge base article")
 
 
 def main():
@@ -182,13 +140,22 @@ def main():
         test_read_knowledge_base,
     ]
     
+    # Share one server process across all tests
     results = []
-    for test in tests:
-        try:
-            results.append(test())
-        except Exception as e:
-            print(f"❌ Test error: {e}")
-            results.append(False)
+    client = MCPSession(MCP_SERVER_PATH)
+    try:
+        for test in tests:
+            try:
+                test(client)
+                results.append(True)
+            except AssertionError as e:
+                print(f"❌ Test failed: {e}")
+                results.append(False)
+            except Exception as e:
+                print(f"❌ Test error: {e}")
+                results.append(False)
+    finally:
+        client.close()
     
     # Summary
     print("\n" + "="*80)
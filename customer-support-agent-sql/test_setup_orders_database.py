@@ -0,0 +1,32 @@
+"""
+Tests for the ODBC to SqlClient connection string conversion used by --bulk-copy.
+
+Usage:
+    pytest test_setup_orders_database.py
+"""
+
+import os
+import sys
+
+import pytest
+
+# setup_orders_database exits at import time without these
+pytest.importorskip("pyodbc")
+pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from setup_orders_database import odbc_to_sqlclient_connection_string, parse_odbc_connection_string
+
+
+def test_braced_driver_is_parsed_and_dropped():
+    connection_string = "Driver={ODBC Driver 18 for SQL Server};Server=tcp:db,1433;Database=orders;"
+    assert parse_odbc_connection_string(connection_string)[0] == ("Driver", "ODBC Driver 18 for SQL Server")
+    assert odbc_to_sqlclient_connection_string(connection_string) == "Server=tcp:db,1433;Database=orders;"
+
+
+def test_braced_password_is_unescaped_and_requoted():
+    connection_string = "Server=db;UID=sa;PWD={a;b}}c};TrustServerCertificate=yes;"
+    assert dict(parse_odbc_connection_string(connection_string))["PWD"] == "a;b}c"
+    assert odbc_to_sqlclient_connection_string(connection_string) == \
+        'Server=db;User ID=sa;Password="a;b}c";TrustServerCertificate=True;'
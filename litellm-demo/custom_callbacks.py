@@ -4,11 +4,25 @@ LiteLLM Custom Callback Handler - Tool Governance Plugin
 This plugin implements governance policies for LLM tool usage.
 """
 
+import os
+import logging
+
 from litellm.integrations.custom_logger import CustomLogger
 from litellm.proxy.proxy_server import UserAPIKeyAuth
 from typing import Any, Optional, List
 from fastapi import HTTPException
 
+logger = logging.getLogger(__name__)
+# Set TOOL_GOVERNANCE_DEBUG=1 to log every governance check
+if os.getenv("TOOL_GOVERNANCE_DEBUG", "").lower() in ("1", "true", "yes"):
+    # Configure only this module's logger; the proxy owns the root logger
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(levelname)s:%(name)s:%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.DEBUG)
+    # Avoid printing each record again through the proxy's handlers
+    logger.propagate = False
+
 class ToolGovernanceHandler(CustomLogger):
     """
     Custom handler that enforces tool governance policies.
@@ -21,43 +35,37 @@ class ToolGovernanceHandler(CustomLogger):
         "update_pricing": "Pricing changes require manager approval."
     }
 
-    AUTHORIZED_TOOLS = {
+    AUTHORIZED_TOOLS = frozenset({
         "get_order_status",
         "search_knowledge_base",
         "get_customer_info",
         "create_support_ticket"
-    }
+    })
+
+    _UNAUTHORIZED_NAMES = frozenset(UNAUTHORIZED_TOOLS)
 
     def __init__(self):
         super().__init__()
         self.blocked_attempts = []  # Track blocked attempts for monitoring
 
     def _extract_tool_calls(self, response) -> List[str]:
-        tool_calls = []
-        
         # Extract tools from response
-        choice = response.choices[0]
-        if hasattr(choice, 'message'):
-            message = choice.message
-            if hasattr(message, 'tool_calls') and message.tool_calls:
-                for tool_call in message.tool_calls:
-                    tool_calls.append(tool_call.function.name)
-        
-        if hasattr(response, 'choices') and len(response.choices) > 0:
-            choice = response.choices[0]
-            if hasattr(choice, 'message'):
-                message = choice.message
-
-                if hasattr(message, 'tool_calls') and message.tool_calls:
-                    for tool_call in message.tool_calls:
-                        if tool_call.type == "function":
-                            tool_calls.append(tool_call.function.name)
-
-        return tool_calls
+        if not hasattr(response, 'choices') or len(response.choices) == 0:
+            return []
+
+        message = getattr(response.choices[0], 'message', None)
+        if message is None or not getattr(message, 'tool_calls', None):
+            return []
+
+        return [
+            tool_call.function.name
+            for tool_call in message.tool_calls
+            if tool_call.type == "function"
+        ]
 
     def _validate_tools(self, tool_names: List[str]) -> Optional[str]:
         for tool_name in tool_names:
-            if tool_name in self.UNAUTHORIZED_TOOLS:
+            if tool_name in self._UNAUTHORIZED_NAMES:
                 reason = self.UNAUTHORIZED_TOOLS[tool_name]
                 return f"🚫 Access Denied: Tool '{tool_name}' is not authorized. {reason}"
 
@@ -80,25 +88,22 @@ class ToolGovernanceHandler(CustomLogger):
         Returns:
             The response object if allowed, raises HTTPException if blocked
         """
-        print("\n" + "="*80)
-        print("🔍 TOOL GOVERNANCE CHECK")
-        print("="*80)
-
-        # Check for tool calls in the response
+        # Check for tool calls in the response; plain text completions need no check
         tool_calls_in_response = self._extract_tool_calls(response)
-        if tool_calls_in_response:
-            print(f"📋 Tool calls in response: {tool_calls_in_response}")
-            error = self._validate_tools(tool_calls_in_response)
-            if error:
-                print(f"❌ BLOCKED: {error}")
-                self.blocked_attempts.append({
-                    "tools": tool_calls_in_response,
-                    "reason": error
-                })
-                raise HTTPException(status_code=403, detail=error)
-
-        print("✅ Tool governance check passed")
-        print("="*80 + "\n")
+        if not tool_calls_in_response:
+            return response
+
+        logger.debug("🔍 Tool governance check: %s", tool_calls_in_response)
+        error = self._validate_tools(tool_calls_in_response)
+        if error:
+            print(f"❌ BLOCKED: {error}")
+            self.blocked_attempts.append({
+                "tools": tool_calls_in_response,
+                "reason": error
+            })
+            raise HTTPException(status_code=403, detail=error)
+
+        return response
 
     async def async_log_success_event(self, kwargs, response_obj, start_time, end_time):
         """
@@ -0,0 +1,36 @@
+"""
+Tests for the tool governance plugin's tool call extraction.
+
+Usage:
+    pytest test_custom_callbacks.py
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+# custom_callbacks needs the proxy extras (fastapi etc.), not just litellm
+pytest.importorskip("litellm.proxy.proxy_server")
+
+from custom_callbacks import ToolGovernanceHandler
+
+
+def make_response(*tool_names):
+    """Build a minimal chat completion response with the given function tool calls."""
+    tool_calls = [
+        SimpleNamespace(type="function", function=SimpleNamespace(name=name))
+        for name in tool_names
+    ]
+    message = SimpleNamespace(tool_calls=tool_calls or None)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_single_tool_call_yields_one_name():
+    handler = ToolGovernanceHandler()
+    assert handler._extract_tool_calls(make_response("refund_order")) == ["refund_order"]
+
+
+def test_no_tool_calls_yields_empty_list():
+    handler = ToolGovernanceHandler()
+    assert handler._extract_tool_calls(make_response()) == []
+    assert handler._extract_tool_calls(SimpleNamespace(choices=[])) == []
@@ -1,11 +1,14 @@
-import os, logging, pprint, argparse, struct, sys
+import os, logging, pprint, argparse, struct, sys, asyncio, random, functools, multiprocessing
 from typing import Annotated, Literal, Sequence
 from typing_extensions import TypedDict
 from urllib.parse import quote_plus
-from sqlalchemy import create_engine, inspect, event, MetaData, Table, text
-from sqlalchemy.schema import DropTable
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from sqlalchemy import create_engine, event, text
 from azure.identity import DefaultAzureCredential
 from pydantic import BaseModel, Field
+import httpx
+import numpy as np
+import tiktoken
 
 from dotenv import load_dotenv
 parser = argparse.ArgumentParser(description='Run script with different environments')
@@ -13,6 +16,8 @@ parser.add_argument("-c", "--create_vector_store", action="store_true",
                     help="Create the vector store table in SQL.")
 parser.add_argument("-d", "--delete", action="store_true",
                     help="Delete the vector store table in SQL instead of querying it")
+parser.add_argument("--semantic-splitter", action="store_true",
+                    help="Split documents with the Rust-based semantic-text-splitter package when creating the vector store. Chunk boundaries differ from the default splitter.")
 parser.add_argument(
     '--env',
     required=True,
@@ -32,10 +37,12 @@ from langchain_sqlserver.vectorstores import SQLServer_VectorStore
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain.tools.retriever import create_retriever_tool
+from langchain_core.documents import Document
 from langchain_core.messages import BaseMessage, HumanMessage
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
 from langchain_core.tools import tool
+from langchain_core.vectorstores import VectorStoreRetriever
 
 
 from langgraph.graph.message import add_messages
@@ -53,14 +60,24 @@ OPENAI_ENDPOINT = os.getenv("OPENAI_ENDPOINT")
 OPENAI_EMBEDDING_API_KEY = os.getenv("OPENAI_EMBEDDING_API_KEY")
 OPENAI_EMBEDDING_ENDPOINT = os.getenv("OPENAI_EMBEDDING_ENDPOINT")
 OPENAI_EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+# Optional: shorten text-embedding-3 vectors to store and scan fewer bytes per row
+OPENAI_EMBEDDING_DIMENSIONS = os.getenv("OPENAI_EMBEDDING_DIMENSIONS")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1")
 MSSQL_CONNECTION_STRING = os.getenv("MSSQL_CONNECTION_STRING")
 TABLE_NAME = os.getenv("TABLE_NAME")
+# Grade retrieved documents with the chat model instead of embedding similarity
+LLM_RELEVANCE_GRADER = os.getenv("LLM_RELEVANCE_GRADER", "false").lower() in ("1", "true", "yes")
+# Rerank a wider candidate set by maximal marginal relevance instead of plain similarity
+RETRIEVER_MMR = os.getenv("RETRIEVER_MMR", "false").lower() in ("1", "true", "yes")
 
 print(f"Loaded environment: {args.env}")
 
 print("Connecting to SQL Server database...")
-engine = create_engine("mssql+pyodbc:///?odbc_connect={}".format(quote_plus(MSSQL_CONNECTION_STRING)))
+# pool_pre_ping replaces connections dropped by the server (e.g. Azure SQL idle timeouts)
+engine = create_engine(
+    "mssql+pyodbc:///?odbc_connect={}".format(quote_plus(MSSQL_CONNECTION_STRING)),
+    pool_pre_ping=True
+)
 # @event.listens_for(engine, "do_connect")
 # def provide_token(dialect, conn_rec, cargs, cparams):
 #     # Retrieve a token from Entra ID
@@ -71,70 +88,65 @@ engine = create_engine("mssql+pyodbc:///?odbc_connect={}".format(quote_plus(MSSQ
 #     cparams["attrs_before"] = {1256: token_struct}  # SQL_COPT_SS_ACCESS_TOKEN
 
 with engine.connect() as conn:
-    result_db_name = conn.execute(text("SELECT DB_NAME() AS name_of_current_database"))
-    database_name_result = result_db_name.fetchone()
-    database_name = database_name_result[0]
-    result_server_name = conn.execute(text("SELECT @@SERVERNAME"))
-    database_server_result = result_server_name.fetchone()
-    database_server = database_server_result[0]
+    database_name, database_server = conn.execute(text("SELECT DB_NAME(), @@SERVERNAME")).fetchone()
 print("Connected to database: {} on server: {}".format(database_name, database_server))
 
 def verify_table_exists():
     """
-    Verify that the 'lilian_weng_blog_posts' table exists in the 'dn-langchain-mssql-demo' SQL Server database 'dn-langchain-mssql-demo'.
-
-    This function uses the existing vector store instance to check table existence
-    by attempting a simple similarity search operation. This approach leverages
-    langchain_sqlserver's built-in Azure SQL Entra ID authentication handling.
+    Verify that the TABLE_NAME document store table exists in the connected database.
 
-    Exits the script with error code 1 if the table does not exist.
+    Exits the script with error code 1 if the table does not exist or the
+    check fails.
     """
     print("Verifying document store table exists...")
 
     try:
-
-        # Use the existing vector store to check table existence
-        # Since langchain_sqlserver handles Azure SQL Entra ID authentication correctly,
-        # we'll leverage the main vector store instance for verification
-        try:
-            # Try to perform a simple operation that requires the table to exist
-            # We'll attempt a similarity search with a dummy query - if the table doesn't exist, this will fail
-          inspector = inspect(engine)
-          table_exists = inspector.has_table(TABLE_NAME)
-          if table_exists:
-              print("Verified: {} table exists".format(TABLE_NAME))
-          else:
-              print("ERROR: Required document store {} table does not exist in the database.".format(TABLE_NAME))
-              print("Please run the data ingestion script first.")
-              sys.exit(1)
-        except Exception as search_error:
-            # Check if the error is specifically about table not existing
-            error_msg = str(search_error).lower()
-            if "invalid object name" in error_msg or "does not exist" in error_msg or "table" in error_msg:
-                print("ERROR: Required document store {} table does not exist in the database.".format(TABLE_NAME))
-                print("Please run the data ingestion script first.")
-                sys.exit(1)
-            else:
-                # Some other error occurred, re-raise it
-                print(f"ERROR: Failed to verify table existence: {str(search_error)}")
-                print("Please check your database connection and try again.")
-                sys.exit(1)
-
-            if not table_exists:
-                print("ERROR: Required document store {} table does not exist in the database.".format(TABLE_NAME))
-                print("Please run the data ingestion script first.")
-                sys.exit(1)
-            else:
-                print("Verified: {} table exists".format(TABLE_NAME))
-
-    except KeyError as e:
-        print(f"ERROR: Environment variable not found: {str(e)}")
-        sys.exit(1)
+        # One targeted query instead of the inspector's schema probes
+        with engine.connect() as conn:
+            table_exists = conn.execute(
+                text("SELECT 1 FROM sys.tables WHERE name = :name"), {"name": TABLE_NAME}
+            ).scalar() is not None
     except Exception as e:
         print(f"ERROR: Failed to verify table existence: {str(e)}")
         print("Please check your database connection and try again.")
         sys.exit(1)
 
+    if not table_exists:
+        print("ERROR: Required document store {} table does not exist in the database.".format(TABLE_NAME))
+        print("Please run the data ingestion script first.")
+        sys.exit(1)
+    print("Verified: {} table exists".format(TABLE_NAME))
+
+@functools.lru_cache(maxsize=1)
+def token_encoding():
+    """Tokenizer used by the OpenAI embedding and chat models."""
+    return tiktoken.get_encoding("cl100k_base")
+
+def token_length(text_):
+    """Token count of `text_`, used as the text splitter's length function."""
+    return len(token_encoding().encode_ordinary(text_))
+
+def _init_split_worker():
+    # Forked workers inherit the engine's pooled pyodbc connection; drop the
+    # pool without closing it so the parent's connection is never touched
+    engine.dispose(close=False)
+
+def split_documents_in_parallel(text_splitter, documents):
+    """
+    Split each document in its own process. This script runs at import
+    time, so only do this where workers can be forked rather than spawned.
+    """
+    if len(documents) < 2 or "fork" not in multiprocessing.get_all_start_methods():
+        return text_splitter.split_documents(documents)
+
+    with ProcessPoolExecutor(
+        max_workers=min(len(documents), os.cpu_count() or 1),
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_init_split_worker
+    ) as executor:
+        splits_per_doc = list(executor.map(text_splitter.split_documents, [[doc] for doc in documents]))
+    return [split for splits in splits_per_doc for split in splits]
+
 if args.create_vector_store:
   urls = [
       "https://lilianweng.github.io/posts/2023-06-23-agent/",
@@ -143,39 +155,208 @@ if args.create_vector_store:
   ]
 
   print("Loading documents...")
-  docs = [WebBaseLoader(url).load() for url in urls]
+  # Fetch the pages concurrently; each load is a blocking HTTP request
+  with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+    docs = list(executor.map(lambda url: WebBaseLoader(url).load(), urls))
   docs_list = [item for sublist in docs for item in sublist]
 
   print("Splitting documents...")
-  text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
-      chunk_size=100, chunk_overlap=50
-  )
-  doc_splits = text_splitter.split_documents(docs_list)
+  if args.semantic_splitter:
+    try:
+      from semantic_text_splitter import TextSplitter
+    except ImportError:
+      print("ERROR: semantic-text-splitter is not installed. Please run: pip install semantic-text-splitter")
+      sys.exit(1)
+    # Same token budget as the default splitter, counted with the embedding model's tokenizer
+    semantic_splitter = TextSplitter.from_tiktoken_model(OPENAI_EMBEDDING_MODEL, capacity=100, overlap=50)
+    doc_splits = [
+        Document(page_content=chunk, metadata=dict(doc.metadata))
+        for doc in docs_list
+        for chunk in semantic_splitter.chunks(doc.page_content)
+    ]
+  else:
+    # Measure chunks in tokens with the shared encoder
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=100, chunk_overlap=50, length_function=token_length
+    )
+    doc_splits = split_documents_in_parallel(text_splitter, docs_list)
+  # Only the chunks are needed from here on; don't keep the full pages alive
+  # for the rest of the run
+  del docs, docs_list
   ids = list(range(len(doc_splits)))
 else:
   verify_table_exists()
 
 # Add Vector Store
 print("Configuring vector store...")
+# One keep-alive connection pool shared by the synchronous OpenAI clients.
+# Async clients keep their own pools, since those are tied to the event loop
+# they were first used on (ingestion and the agent run on different loops)
+http_client = httpx.Client(
+    timeout=60,
+    limits=httpx.Limits(max_connections=20, max_keepalive_connections=20)
+)
+# Up to 1024 chunks per /embeddings request; at ~100 tokens per chunk this
+# stays well below the per-request token limit
+embeddings = OpenAIEmbeddings(
+    model=OPENAI_EMBEDDING_MODEL,
+    api_key=OPENAI_EMBEDDING_API_KEY,
+    base_url=OPENAI_EMBEDDING_ENDPOINT,
+    chunk_size=1024,
+    max_retries=6,
+    request_timeout=60,
+    http_client=http_client,
+    dimensions=int(OPENAI_EMBEDDING_DIMENSIONS) if OPENAI_EMBEDDING_DIMENSIONS else None
+)
+# Searches are exact VECTOR_DISTANCE scans; see "Performance Considerations"
+# in the README for why no DiskANN vector index is created
+# Inserts are multi-row INSERT ... VALUES statements, so insert the maximum
+# 419 rows per statement, sharing the engine (and its pool) created above
 vector_store = SQLServer_VectorStore(
-    embedding_function=OpenAIEmbeddings(
-        model=OPENAI_EMBEDDING_MODEL,
-        api_key=OPENAI_EMBEDDING_API_KEY,
-        base_url=OPENAI_EMBEDDING_ENDPOINT
-    ),
-    embedding_length=1536,
+    connection=engine,
+    embedding_function=embeddings,
+    embedding_length=int(OPENAI_EMBEDDING_DIMENSIONS or 1536),
     connection_string=MSSQL_CONNECTION_STRING,
-    table_name=TABLE_NAME
+    table_name=TABLE_NAME,
+    batch_size=419
 )
 
+EMBEDDING_BATCH_SIZE = 1024
+# Stay under the embeddings API's per-request token limit
+EMBEDDING_BATCH_MAX_TOKENS = 250_000
+MAX_CONCURRENT_EMBEDDING_REQUESTS = 5
+
+def pack_embedding_batches(texts, max_items=EMBEDDING_BATCH_SIZE, max_tokens=EMBEDDING_BATCH_MAX_TOKENS):
+    """
+    Greedily pack texts into batches, flushing when either the item count
+    or the token count limit would be exceeded.
+    """
+    token_counts = [len(tokens) for tokens in token_encoding().encode_ordinary_batch(texts)]
+    batch, batch_tokens = [], 0
+    for text_, num_tokens in zip(texts, token_counts):
+        if batch and (len(batch) == max_items or batch_tokens + num_tokens > max_tokens):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(text_)
+        batch_tokens += num_tokens
+    if batch:
+        yield batch
+
+async def embed_texts(texts):
+    """
+    Embed texts in batches from pack_embedding_batches(), with up to
+    MAX_CONCURRENT_EMBEDDING_REQUESTS requests in flight. Vectors are
+    returned in the order of `texts`.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_EMBEDDING_REQUESTS)
+
+    async def embed_batch(batch):
+        async with semaphore:
+            # Jitter the start so concurrent requests don't hit rate limits in lockstep
+            await asyncio.sleep(random.uniform(0, 0.1))
+            return await embeddings.aembed_documents(batch)
+
+    # gather() keeps the results in batch order
+    results = await asyncio.gather(*(embed_batch(batch) for batch in pack_embedding_batches(texts)))
+    return [vector for batch_vectors in results for vector in batch_vectors]
+
+# Embed and insert this many texts at a time, so only one window's vectors
+# are held in memory; one window still keeps every concurrent request busy
+EMBEDDING_WINDOW_SIZE = EMBEDDING_BATCH_SIZE * MAX_CONCURRENT_EMBEDDING_REQUESTS
+
+def insert_embeddings(texts, vectors, metadatas, ids):
+    # The vector store has no public add-by-embedding API; _insert_embeddings
+    # is what add_texts calls for each of its batches
+    batch_size = vector_store.batch_size
+    for i in range(0, len(texts), batch_size):
+        vector_store._insert_embeddings(
+            texts[i:i + batch_size],
+            vectors[i:i + batch_size],
+            metadatas[i:i + batch_size],
+            ids[i:i + batch_size]
+        )
+
+async def embed_and_insert_documents(documents, ids):
+    for start in range(0, len(documents), EMBEDDING_WINDOW_SIZE):
+        window = documents[start:start + EMBEDDING_WINDOW_SIZE]
+        texts = [doc.page_content for doc in window]
+        vectors = await embed_texts(texts)
+        await asyncio.to_thread(
+            insert_embeddings,
+            texts,
+            vectors,
+            [doc.metadata for doc in window],
+            ids[start:start + EMBEDDING_WINDOW_SIZE]
+        )
+
+def add_embedded_documents(documents, ids):
+    """
+    Embed the documents in large concurrent batches, then insert them into
+    the vector store, one window of EMBEDDING_WINDOW_SIZE documents at a time.
+
+    SQLServer_VectorStore.add_documents embeds one insert batch (at most 419
+    texts) per request, one request at a time.
+    """
+    asyncio.run(embed_and_insert_documents(documents, ids))
+
 if args.create_vector_store:
   vector_store.delete()
 
   print("Adding documents...")
-  vector_store.add_documents(doc_splits, ids=ids)    
+  add_embedded_documents(doc_splits, ids)
+
+RETRIEVAL_CACHE_SIZE = 1024
+
+def normalize_query(query):
+    return " ".join(query.split())
+
+@functools.lru_cache(maxsize=RETRIEVAL_CACHE_SIZE)
+def cached_embed_query(query):
+    return tuple(embeddings.embed_query(query))
+
+@functools.lru_cache(maxsize=RETRIEVAL_CACHE_SIZE)
+def cached_similarity_search(query, k, fetch_k=None, lambda_mult=None):
+    embedding = list(cached_embed_query(query))
+    if fetch_k:
+        # Over-fetch fetch_k candidates (with their vectors) and rerank them
+        # locally by maximal marginal relevance down to k
+        return tuple(vector_store.max_marginal_relevance_search_by_vector(
+            embedding, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult
+        ))
+    return tuple(vector_store.similarity_search_by_vector(embedding, k=k))
+
+class CachedRetriever(VectorStoreRetriever):
+    """
+    Retriever that reuses query embeddings and search results, so a rewrite
+    loop that retrieves the same query again skips the embeddings request
+    and the database round trip.
+    """
+
+    def _get_relevant_documents(self, query, *, run_manager):
+        k = self.search_kwargs.get("k", 4)
+        if self.search_type == "mmr":
+            fetch_k = self.search_kwargs.get("fetch_k", 20)
+            lambda_mult = self.search_kwargs.get("lambda_mult", 0.5)
+            return list(cached_similarity_search(normalize_query(query), k, fetch_k, lambda_mult))
+        return list(cached_similarity_search(normalize_query(query), k))
+
+    async def _aget_relevant_documents(self, query, *, run_manager):
+        # The async graph calls this; go through the same cache
+        return await asyncio.to_thread(self._get_relevant_documents, query, run_manager=run_manager.get_sync())
 
 print("Creating retriever tool...")
-retriever = vector_store.as_retriever()
+# Searches are exact, so by default the top 4 by cosine distance are returned
+# as-is. Chunks overlap by half, so those are often near-duplicates;
+# RETRIEVER_MMR reranks 12 candidates, weighted mostly towards relevance, so
+# the 4 returned cover more distinct text
+if RETRIEVER_MMR:
+    retriever = CachedRetriever(
+        vectorstore=vector_store,
+        search_type="mmr",
+        search_kwargs={"k": 4, "fetch_k": 12, "lambda_mult": 0.8}
+    )
+else:
+    retriever = CachedRetriever(vectorstore=vector_store, search_kwargs={"k": 4})
 retriever_tool = create_retriever_tool(
     retriever,
     "retrieve_blog_posts",
@@ -187,24 +368,25 @@ if "windows.net" in MSSQL_CONNECTION_STRING:
 else:
     database_server_type = "On-Premises SQL Server"
 
-@tool(description="Delete the {0} table from the {1} database on the {2} {3}. This is a destructive operation that will permanently \
-                  remove the table and all its data. Use with caution as this action cannot be undone. Returns: str: A message \
-                  indicating the result of the operation".format(TABLE_NAME, database_name, database_server, database_server_type))
+# The tool schema is sent with every agent LLM call, so keep the description short
+DELETE_TOOL_DESCRIPTION = (
+    f"Permanently delete the {TABLE_NAME} table from the {database_name} database "
+    f"on {database_server_type} {database_server}. Destructive and irreversible."
+)
+
+@tool(description=DELETE_TOOL_DESCRIPTION)
 def delete_blog_posts_table() -> str:
     print("---DELETE TABLE OPERATION REQUESTED---")
 
     try:
         print("Connecting to SQL Server database {} using langchain_sqlserver...".format(database_name))
 
-        # Create a temporary SQLServer_VectorStore instance to use its delete method
-        # We use the same configuration as the main vector_store but create a new instance
-        # to avoid affecting the main vector store object
-        metadata = MetaData()
-        table = Table(TABLE_NAME, metadata, autoload_with=engine)
-        # Drop the table
-        with engine.connect() as conn:
-            conn.execute(DropTable(table, if_exists=True))
-            conn.commit()
+        # No reflection round trips; the drop is all that's needed
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS [{}]".format(TABLE_NAME.replace("]", "]]"))))
+        # Don't serve results from the dropped table
+        cached_similarity_search.cache_clear()
+        return f"Table {TABLE_NAME} deleted from database {database_name}"
     except KeyError as e:
         error_message = f"Environment variable not found: {str(e)}"
         print(f"---ERROR: {error_message}---")
@@ -216,6 +398,61 @@ def delete_blog_posts_table() -> str:
     
 tools = [retriever_tool, delete_blog_posts_table]
 
+# Build the LLM clients, prompts and chains once so every graph node reuses
+# the same HTTP connection pool instead of setting up a new client per call
+print("Initializing LLM clients...")
+LLM = ChatOpenAI(
+    api_key=OPENAI_API_KEY,
+    base_url=OPENAI_ENDPOINT,
+    model=OPENAI_MODEL,
+    streaming=True,
+    temperature=0,
+    http_client=http_client
+)
+AGENT_LLM = LLM.bind_tools(tools)
+
+# Structured output schema for the LLM relevance grader
+class Grade(BaseModel):
+    """Binary score for relevance check."""
+
+    binary_score: str = Field(description="Relevance score 'yes' or 'no'")
+
+GRADE_PROMPT = PromptTemplate(
+    template="""You are a grader assessing relevance of a retrieved document to a user question. \n 
+    Here is the retrieved document: \n\n {context} \n\n
+    Here is the user question: {question} \n
+    If the document contains keyword(s) or semantic meaning related to the user question, grade it as relevant. \n
+    Give a binary score 'yes' or 'no' score to indicate whether the document is relevant to the question.""",
+    input_variables=["context", "question"],
+)
+GRADE_CHAIN = GRADE_PROMPT | LLM.with_structured_output(Grade)
+
+GENERATE_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            """ 
+            You are the Lilian Weng blog post agent. You are an assistant for question-answering tasks. Use the following pieces of retrieved context to answer the question. If you don't know the answer, just say that you don't know. Use three sentences maximum and keep the answer concise.            
+            Context: {context} 
+            """,
+        ),
+        (
+            "human",
+            "Question: {question} ?",
+        ),
+    ]
+)
+RAG_CHAIN = GENERATE_PROMPT | LLM | StrOutputParser()
+
+# Minimum question/document cosine similarity for the embedding grader
+RELEVANCE_THRESHOLD = 0.35
+
+def cosine_similarity(query_vector, vectors):
+    """Cosine similarity of `query_vector` to each row of `vectors`, as one matrix-vector product."""
+    q = np.asarray(query_vector, dtype=np.float32)
+    m = np.asarray(vectors, dtype=np.float32)
+    return (m @ q) / (np.linalg.norm(m, axis=1) * np.linalg.norm(q))
+
 print("Initializing Agent state class...")
 class AgentState(TypedDict):
     # The add_messages function defines how an update should be processed
@@ -227,7 +464,7 @@ class AgentState(TypedDict):
 ###
 print("Initializing Agent graph edges...")
 
-def grade_documents(state) -> Literal["generate", "rewrite"]:
+async def grade_documents(state) -> Literal["generate", "rewrite"]:
     """
     Determines whether the retrieved documents are relevant to the question.
 
@@ -240,46 +477,22 @@ def grade_documents(state) -> Literal["generate", "rewrite"]:
 
     print("---CHECK RELEVANCE---")
 
-    # Data model
-    class grade(BaseModel):
-        """Binary score for relevance check."""
-
-        binary_score: str = Field(description="Relevance score 'yes' or 'no'")
-
-    # LLM
-    model = ChatOpenAI(
-        api_key=OPENAI_API_KEY,
-        base_url=OPENAI_ENDPOINT,
-        model=OPENAI_MODEL,
-        streaming=True,
-        temperature=0,
-    )
-
-    # LLM with tool and validation
-    llm_with_tool = model.with_structured_output(grade)
-
-    # Prompt
-    prompt = PromptTemplate(
-        template="""You are a grader assessing relevance of a retrieved document to a user question. \n 
-        Here is the retrieved document: \n\n {context} \n\n
-        Here is the user question: {question} \n
-        If the document contains keyword(s) or semantic meaning related to the user question, grade it as relevant. \n
-        Give a binary score 'yes' or 'no' score to indicate whether the document is relevant to the question.""",
-        input_variables=["context", "question"],
-    )
-
-    # Chain
-    chain = prompt | llm_with_tool
-
     messages = state["messages"]
     last_message = messages[-1]
 
     question = messages[0].content
     docs = last_message.content
 
-    scored_result = chain.invoke({"question": question, "context": docs})
-
-    score = scored_result.binary_score
+    if LLM_RELEVANCE_GRADER:
+        score = (await GRADE_CHAIN.ainvoke({"question": question, "context": docs})).binary_score
+    else:
+        # One embeddings request for both texts instead of a chat completion.
+        # Use the sync client: the async one may still hold connections from
+        # the event loop that ran ingestion, which is closed by now
+        question_vector, docs_vector = await asyncio.to_thread(embeddings.embed_documents, [question, docs])
+        similarity = float(cosine_similarity(question_vector, [docs_vector])[0])
+        print(f"---SIMILARITY: {similarity:.3f}---")
+        score = "yes" if similarity > RELEVANCE_THRESHOLD else "no"
 
     if score == "yes":
         print("---DECISION: DOCS RELEVANT---")
@@ -295,7 +508,7 @@ def grade_documents(state) -> Literal["generate", "rewrite"]:
 ###
 print("Initializing Agent graph nodes...")
 
-def agent(state):
+async def agent(state):
     """
     Invokes the agent model to generate a response based on the current state. Given
     the question, it will decide to retrieve using the retriever tool, or simply end.
@@ -308,20 +521,12 @@ def agent(state):
     """
     print("---CALL AGENT---")
     messages = state["messages"]
-    model = ChatOpenAI(
-        api_key=OPENAI_API_KEY,
-        base_url=OPENAI_ENDPOINT,
-        model=OPENAI_MODEL,
-        streaming=True,
-        temperature=0
-    )
-    model = model.bind_tools(tools)
-    response = model.invoke(messages)
+    response = await AGENT_LLM.ainvoke(messages)
     # We return a list, because this will get added to the existing list
     return {"messages": [response]}
 
 
-def rewrite(state):
+async def rewrite(state):
     """
     Transform the query to produce a better question.
 
@@ -348,19 +553,11 @@ def rewrite(state):
         )
     ]
 
-    # Grader
-    model = ChatOpenAI(
-        api_key=OPENAI_API_KEY,
-        base_url=OPENAI_ENDPOINT,
-        model=OPENAI_MODEL,
-        streaming=True,
-        temperature=0
-    )
-    response = model.invoke(msg)
+    response = await LLM.ainvoke(msg)
     return {"messages": [response]}
 
 
-def generate(state):
+async def generate(state):
     """
     Generate answer
 
@@ -377,62 +574,11 @@ def generate(state):
 
     docs = last_message.content
 
-    # Prompt
-    prompt = prompt = ChatPromptTemplate.from_messages(
-        [
-            (
-                "system",
-                """ 
-                You are the Lilian Weng blog post agent. You are an assistant for question-answering tasks. Use the following pieces of retrieved context to answer the question. If you don't know the answer, just say that you don't know. Use three sentences maximum and keep the answer concise.            
-                Context: {context} 
-                """,
-            ),
-            (
-                "human",
-                "Question: {question} ?",
-            ),
-        ]
-    )
-
-    # LLM
-    llm = ChatOpenAI(
-        api_key=OPENAI_API_KEY,
-        base_url=OPENAI_ENDPOINT,
-        model=OPENAI_MODEL,
-        streaming=True,
-        temperature=0
-    )
-
-    # Post-processing
-    def format_docs(docs):
-        return "\n\n".join(doc.page_content for doc in docs)
-
-    # Chain
-    rag_chain = prompt | llm | StrOutputParser()
-
     # Run
-    response = rag_chain.invoke({"context": docs, "question": question})
+    response = await RAG_CHAIN.ainvoke({"context": docs, "question": question})
     return {"messages": [response]}
 
 
-# Define the prompt
-print("Initializing prompt...")
-prompt = ChatPromptTemplate.from_messages(
-    [
-        (
-            "system",
-            """ 
-            You are the Lilian Weng blog post agent.You are an assistant for question-answering tasks. Use the following pieces of retrieved context to answer the question. If you don't know the answer, just say that you don't know. Use three sentences maximum and keep the answer concise.            
-            Context: {context} 
-            """,
-        ),
-        (
-            "human",
-            "Question: {question} ?",
-        ),
-    ]
-)
-
 # Define a new graph
 print("Initializing agent graph...")
 workflow = StateGraph(AgentState)
@@ -487,9 +633,14 @@ inputs = {
         ("user", question),
     ]
 }
-for output in graph.stream(inputs):
-    for key, value in output.items():
-        pprint.pprint(f"Output from node '{key}':")
+async def run_agent(inputs):
+    # The nodes are coroutines, so LLM calls don't block the event loop
+    # while tool calls and retrieval are in flight
+    async for output in graph.astream(inputs):
+        for key, value in output.items():
+            pprint.pprint(f"Output from node '{key}':")
+            pprint.pprint("---")
+            pprint.pprint(value, indent=2, width=80, depth=None)
         pprint.pprint("---")
-        pprint.pprint(value, indent=2, width=80, depth=None)
-    pprint.pprint("---")
\ No newline at end of file
+
+asyncio.run(run_agent(inputs))
\ No newline at end of file